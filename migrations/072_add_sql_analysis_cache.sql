@@ -0,0 +1,7 @@
+-- SQL analysis cache: SqlAnalyzer output keyed by file content hash
+-- Lets re-imports skip parsing SQL files whose content hasn't changed
+CREATE TABLE IF NOT EXISTS sql_analysis_cache (
+    content_hash TEXT PRIMARY KEY,   -- SHA-256 of the analyzed file content
+    objects_json TEXT NOT NULL,      -- JSON array of SqlObject fields
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
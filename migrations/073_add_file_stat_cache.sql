@@ -0,0 +1,9 @@
+-- File stat cache: content hash of a working-tree file at a given size/mtime
+-- Lets change detection skip reading and hashing files whose stat is unchanged
+CREATE TABLE IF NOT EXISTS file_stat_cache (
+    file_id INTEGER PRIMARY KEY REFERENCES project_files(id) ON DELETE CASCADE,
+    size_bytes INTEGER NOT NULL,     -- st_size when the file was hashed
+    mtime_ns INTEGER NOT NULL,       -- st_mtime_ns when the file was hashed
+    content_hash TEXT NOT NULL,      -- SHA-256 of the content at that stat
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
@@ -0,0 +1,4 @@
+-- Covering index for per-environment env_vars reads (direnv generation)
+-- UNIQUE(key, environment) leads with key, so WHERE environment = ? scanned the table
+CREATE INDEX IF NOT EXISTS idx_env_vars_environment
+    ON env_vars(environment, key, value);
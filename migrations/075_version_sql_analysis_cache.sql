@@ -0,0 +1,11 @@
+-- Key the SQL analysis cache by analyzer version as well as content hash
+-- so a change to SqlAnalyzer output invalidates earlier analyses. The table
+-- only holds derived data, so it is rebuilt empty.
+DROP TABLE IF EXISTS sql_analysis_cache;
+CREATE TABLE IF NOT EXISTS sql_analysis_cache (
+    content_hash TEXT NOT NULL,          -- SHA-256 of the analyzed file content
+    analyzer_version INTEGER NOT NULL,   -- SqlAnalyzer.CACHE_VERSION that produced it
+    objects_json TEXT NOT NULL,          -- JSON array of SqlObject fields
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (content_hash, analyzer_version)
+);
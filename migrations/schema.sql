@@ -669,6 +669,14 @@ CREATE TABLE IF NOT EXISTS file_metadata (
     FOREIGN KEY (file_id) REFERENCES project_files(id) ON DELETE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS file_stat_cache (
+    file_id INTEGER PRIMARY KEY REFERENCES project_files(id) ON DELETE CASCADE,
+    size_bytes INTEGER NOT NULL,     -- st_size when the file was hashed
+    mtime_ns INTEGER NOT NULL,       -- st_mtime_ns when the file was hashed
+    content_hash TEXT NOT NULL,      -- SHA-256 of the content at that stat
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
 CREATE TABLE IF NOT EXISTS file_types (
     id INTEGER PRIMARY KEY,
     type_name TEXT NOT NULL UNIQUE,  -- e.g., 'sql_table', 'plpgsql_function', 'javascript', 'jsx_component', 'edge_function'
@@ -1554,6 +1562,14 @@ CREATE TABLE IF NOT EXISTS secret_key_assignments (
     PRIMARY KEY (secret_blob_id, key_id)
 );
 
+CREATE TABLE IF NOT EXISTS sql_analysis_cache (
+    content_hash TEXT NOT NULL,          -- SHA-256 of the analyzed file content
+    analyzer_version INTEGER NOT NULL,   -- SqlAnalyzer.CACHE_VERSION that produced it
+    objects_json TEXT NOT NULL,          -- JSON array of SqlObject fields
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (content_hash, analyzer_version)
+);
+
 CREATE TABLE IF NOT EXISTS subLoops (
   bTitle TEXT NOT NULL,
   tStamp DATETIME NOT NULL,
@@ -2190,6 +2206,8 @@ CREATE INDEX IF NOT EXISTS idx_encryption_keys_recipient ON encryption_keys(reci
 
 CREATE INDEX IF NOT EXISTS idx_encryption_keys_type ON encryption_keys(key_type);
 
+CREATE INDEX IF NOT EXISTS idx_env_vars_environment ON env_vars(environment, key, value);
+
 CREATE INDEX IF NOT EXISTS idx_environment_variables_name
     ON environment_variables(var_name);
 
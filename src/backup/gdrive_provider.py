@@ -21,6 +21,14 @@ try:
 except ImportError:
     GDRIVE_AVAILABLE = False
 
+try:
+    import yaml
+    YAML_AVAILABLE = True
+    # libyaml-backed loader when PyYAML was built with it
+    _YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:
+    YAML_AVAILABLE = False
+
 from backup.base import CloudBackupProvider
 from logger import get_logger
 
@@ -122,12 +130,10 @@ class GDriveBackupProvider(CloudBackupProvider):
             # Parse YAML and convert to Google OAuth JSON format
             decrypted_yaml = proc.stdout.decode('utf-8')
 
-            try:
-                import yaml
-                creds_data = yaml.safe_load(decrypted_yaml)
-            except ImportError:
+            if not YAML_AVAILABLE:
                 logger.error("PyYAML not installed, cannot load credentials from secrets")
                 return None
+            creds_data = yaml.load(decrypted_yaml, Loader=_YamlLoader)
 
             # Write to temporary file
             temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
@@ -8,6 +8,7 @@ or for programmatic access.
 """
 import sys
 import os
+import shlex
 import subprocess
 import tempfile
 import hashlib
@@ -86,7 +87,7 @@ class FileCommands(Command):
 
             try:
                 editor = os.environ.get('EDITOR', 'vi')
-                subprocess.run([editor, tmp_path], check=True)
+                subprocess.run([*shlex.split(editor), tmp_path], check=True)
 
                 # Read back and write to DB if changed
                 new_content = Path(tmp_path).read_text()
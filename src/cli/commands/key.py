@@ -15,6 +15,8 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from repositories import BaseRepository
 from cli.core import Command
+from config import DEFAULT_AUTHOR
+from json_utils import dumps as _dumps
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -171,8 +173,8 @@ class KeyCommands(Command):
         """, (
             key_id,
             action,
-            os.environ.get('USER', 'unknown'),
-            json.dumps(details or {}),
+            DEFAULT_AUTHOR,
+            _dumps(details or {}),
             1 if success else 0
         ))
 
@@ -240,7 +242,7 @@ class KeyCommands(Command):
                     INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
                     VALUES (?, ?, ?)
                     ON CONFLICT(secret_blob_id, key_id) DO NOTHING
-                """, (secret['id'], key_id, os.environ.get('USER', 'unknown')))
+                """, (secret['id'], key_id, DEFAULT_AUTHOR))
 
                 logger.info(f"  ✓ Added to {secret['slug']} ({secret['profile']})")
                 success_count += 1
@@ -876,7 +878,7 @@ class KeyCommands(Command):
                 revoked_by = ?,
                 revocation_reason = ?
             WHERE id = ?
-        """, (os.environ.get('USER', 'unknown'), reason, key_to_revoke['id']))
+        """, (DEFAULT_AUTHOR, reason, key_to_revoke['id']))
 
         # Log revocation with approval details
         self.repo.execute("""
@@ -884,7 +886,7 @@ class KeyCommands(Command):
             VALUES (?, 'revoke', ?, ?, 1)
         """, (
             key_to_revoke['id'],
-            os.environ.get('USER', 'unknown'),
+            DEFAULT_AUTHOR,
             json.dumps({
                 "reason": reason,
                 "approvals": approvals,
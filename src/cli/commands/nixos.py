@@ -7,6 +7,7 @@ Includes dirty-state tracking, auto-generated file headers,
 and status/edit-template subcommands.
 """
 import json
+import shlex
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -812,7 +813,7 @@ class NixOSCommand(Command):
         for t in templates:
             print(f"  {t.relative_to(repo)}")
 
-        _sp.run([editor] + [str(t) for t in templates])
+        _sp.run(shlex.split(editor) + [str(t) for t in templates])
         return 0
 
     def doctor(self, args) -> int:
@@ -4,6 +4,7 @@ Query and open files in editor using natural language
 """
 import json
 import os
+import shlex
 import sys
 import subprocess
 from pathlib import Path
@@ -114,7 +115,7 @@ class QueryOpenCommands(Command):
 
         # Open files
         try:
-            subprocess.run([editor] + full_paths)
+            subprocess.run(shlex.split(editor) + full_paths)
             return 0
         except Exception as e:
             print(f"Error opening files with {editor}: {e}", file=sys.stderr)
@@ -5,17 +5,27 @@ No YAML bundles - direct key-value storage with metadata
 """
 import sys
 import os
-import json
 import subprocess
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from repositories import BaseRepository, ProjectRepository
 from cli.core import Command
+from config import DEFAULT_AUTHOR
+from json_utils import dumps as _dumps
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import yaml
+    YAML_AVAILABLE = True
+    # libyaml-backed loader/dumper when PyYAML was built with it
+    _YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    _YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+except ImportError:
+    YAML_AVAILABLE = False
+
 
 class SecretV2Commands(Command):
     """Individual secret management command handlers"""
@@ -137,18 +147,19 @@ class SecretV2Commands(Command):
             sys.exit(1)
         return project['id']
 
-    def _audit_log(self, action: str, slug: str, secret_name: str, metadata: dict = None):
-        """Log audit event"""
+    def _audit_log(self, action: str, slug: str, secret_name: str, metadata: dict = None,
+                   commit: bool = True):
+        """Log audit event (commit=False to ride along in the caller's transaction)"""
         self.secret_repo.execute("""
             INSERT INTO audit_log (ts, actor, action, project_slug, profile, details)
             VALUES (datetime('now'), ?, ?, ?, ?, ?)
         """, (
-            os.environ.get('USER', 'unknown'),
+            DEFAULT_AUTHOR,
             action,
             slug,
             secret_name,
-            json.dumps(metadata or {})
-        ))
+            _dumps(metadata or {})
+        ), commit=commit)
 
     def secret_set(self, args) -> int:
         """Set an individual secret"""
@@ -185,53 +196,54 @@ class SecretV2Commands(Command):
             WHERE psb.project_id = ? AND sb.secret_name = ? AND psb.profile = ?
         """, (project_id, secret_name, profile))
 
-        if existing:
-            # Update existing secret
-            self.secret_repo.execute("""
-                UPDATE secret_blobs
-                SET secret_blob = ?, updated_at = datetime('now')
-                WHERE id = ?
-            """, (encrypted, existing['id']))
-
-            # Update key assignments
-            self.secret_repo.execute("""
-                DELETE FROM secret_key_assignments WHERE secret_blob_id = ?
-            """, (existing['id'],))
-
-            for key_id in key_ids:
+        with self.secret_repo.transaction():
+            if existing:
+                # Update existing secret
                 self.secret_repo.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
-                    VALUES (?, ?, ?)
-                """, (existing['id'], key_id, os.environ.get('USER', 'unknown')))
-
-            logger.info(f"✓ Updated secret '{secret_name}' for {slug}")
-        else:
-            # Create new secret blob
-            self.secret_repo.execute("""
-                INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
-                VALUES (?, ?, ?, ?)
-            """, (profile, secret_name, encrypted, 'application/text'))
+                    UPDATE secret_blobs
+                    SET secret_blob = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                """, (encrypted, existing['id']), commit=False)
 
-            secret_blob_id = self.secret_repo.query_one("""
-                SELECT id FROM secret_blobs WHERE id = last_insert_rowid()
-            """)['id']
+                # Update key assignments
+                self.secret_repo.execute("""
+                    DELETE FROM secret_key_assignments WHERE secret_blob_id = ?
+                """, (existing['id'],), commit=False)
+
+                for key_id in key_ids:
+                    self.secret_repo.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (existing['id'], key_id, DEFAULT_AUTHOR), commit=False)
+
+                logger.info(f"✓ Updated secret '{secret_name}' for {slug}")
+            else:
+                # Create new secret blob
+                self.secret_repo.execute("""
+                    INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
+                    VALUES (?, ?, ?, ?)
+                """, (profile, secret_name, encrypted, 'application/text'), commit=False)
 
-            # Link to project
-            self.secret_repo.execute("""
-                INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
-                VALUES (?, ?, ?)
-            """, (project_id, secret_blob_id, profile))
+                secret_blob_id = self.secret_repo.query_one("""
+                    SELECT id FROM secret_blobs WHERE id = last_insert_rowid()
+                """)['id']
 
-            # Record key assignments
-            for key_id in key_ids:
+                # Link to project
                 self.secret_repo.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                    INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
                     VALUES (?, ?, ?)
-                """, (secret_blob_id, key_id, os.environ.get('USER', 'unknown')))
+                """, (project_id, secret_blob_id, profile), commit=False)
+
+                # Record key assignments
+                for key_id in key_ids:
+                    self.secret_repo.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (secret_blob_id, key_id, DEFAULT_AUTHOR), commit=False)
 
-            logger.info(f"✓ Set secret '{secret_name}' for {slug}")
+                logger.info(f"✓ Set secret '{secret_name}' for {slug}")
 
-        self._audit_log('set-secret', slug, secret_name, {'keys': key_names})
+            self._audit_log('set-secret', slug, secret_name, {'keys': key_names}, commit=False)
         return 0
 
     def secret_get(self, args) -> int:
@@ -371,23 +383,24 @@ class SecretV2Commands(Command):
             logger.error(f"Secret '{secret_name}' not found for {slug}")
             return 1
 
-        # Remove from join table
-        self.secret_repo.execute("""
-            DELETE FROM project_secret_blobs
-            WHERE project_id = ? AND secret_blob_id = ? AND profile = ?
-        """, (project_id, row['secret_blob_id'], profile))
-
-        # If no other projects reference this secret, delete the blob
-        if row['share_count'] == 1:
+        with self.secret_repo.transaction():
+            # Remove from join table
             self.secret_repo.execute("""
-                DELETE FROM secret_blobs WHERE id = ?
-            """, (row['secret_blob_id'],))
-            logger.info(f"✓ Deleted secret '{secret_name}' from {slug}")
-        else:
-            logger.info(f"✓ Removed secret '{secret_name}' from {slug}")
-            logger.info(f"  Secret is still shared with {row['share_count'] - 1} other project(s)")
+                DELETE FROM project_secret_blobs
+                WHERE project_id = ? AND secret_blob_id = ? AND profile = ?
+            """, (project_id, row['secret_blob_id'], profile), commit=False)
 
-        self._audit_log('delete-secret', slug, secret_name, {})
+            # If no other projects reference this secret, delete the blob
+            if row['share_count'] == 1:
+                self.secret_repo.execute("""
+                    DELETE FROM secret_blobs WHERE id = ?
+                """, (row['secret_blob_id'],), commit=False)
+                logger.info(f"✓ Deleted secret '{secret_name}' from {slug}")
+            else:
+                logger.info(f"✓ Removed secret '{secret_name}' from {slug}")
+                logger.info(f"  Secret is still shared with {row['share_count'] - 1} other project(s)")
+
+            self._audit_log('delete-secret', slug, secret_name, {}, commit=False)
         return 0
 
     def secret_share_key(self, args) -> int:
@@ -423,16 +436,17 @@ class SecretV2Commands(Command):
             logger.warning(f"Secret '{secret_name}' already shared with {target_slug}")
             return 0
 
-        # Share by creating join table entry
-        self.secret_repo.execute("""
-            INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
-            VALUES (?, ?, ?)
-        """, (target_project_id, secret['secret_blob_id'], profile))
+        with self.secret_repo.transaction():
+            # Share by creating join table entry
+            self.secret_repo.execute("""
+                INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
+                VALUES (?, ?, ?)
+            """, (target_project_id, secret['secret_blob_id'], profile), commit=False)
 
-        logger.info(f"✓ Shared '{secret_name}' from {source_slug} to {target_slug}")
-        logger.info(f"  Both projects now have access to the same secret")
+            logger.info(f"✓ Shared '{secret_name}' from {source_slug} to {target_slug}")
+            logger.info(f"  Both projects now have access to the same secret")
 
-        self._audit_log('share-secret', f"{source_slug}→{target_slug}", secret_name, {})
+            self._audit_log('share-secret', f"{source_slug}→{target_slug}", secret_name, {}, commit=False)
         return 0
 
     def secret_export(self, args) -> int:
@@ -476,22 +490,22 @@ class SecretV2Commands(Command):
 
         # Format output
         if fmt == 'yaml':
-            try:
-                import yaml
-                print(yaml.safe_dump(env_vars, sort_keys=True))
-            except ImportError:
+            if not YAML_AVAILABLE:
                 logger.error("PyYAML not installed. Install with: pip install pyyaml")
                 return 1
+            print(yaml.dump(env_vars, Dumper=_YamlDumper, sort_keys=True))
         elif fmt == 'json':
-            print(json.dumps(env_vars, indent=2, sort_keys=True))
+            print(_dumps(env_vars, indent=True, sort_keys=True))
         elif fmt == 'dotenv':
-            for key, value in sorted(env_vars.items()):
-                print(f"{key}={value}")
+            sys.stdout.write(''.join(
+                f"{key}={value}\n" for key, value in sorted(env_vars.items())
+            ))
         elif fmt == 'shell':
-            for key, value in sorted(env_vars.items()):
-                # Escape single quotes in value
-                escaped_value = str(value).replace("'", "'\\''")
-                print(f"export {key}='{escaped_value}'")
+            # Escape single quotes in each value
+            sys.stdout.write(''.join(
+                "export {}='{}'\n".format(key, str(value).replace("'", "'\\''"))
+                for key, value in sorted(env_vars.items())
+            ))
         else:
             logger.error(f"Unknown format: {fmt}")
             logger.info("Supported formats: yaml, json, dotenv, shell")
@@ -501,9 +515,7 @@ class SecretV2Commands(Command):
 
     def secret_migrate(self, args) -> int:
         """Migrate YAML-based secrets to individual secrets"""
-        try:
-            import yaml
-        except ImportError:
+        if not YAML_AVAILABLE:
             logger.error("PyYAML not installed. Install with: pip install pyyaml")
             return 1
 
@@ -545,7 +557,7 @@ class SecretV2Commands(Command):
         # Decrypt YAML
         try:
             decrypted = self._age_decrypt(yaml_secret['secret_blob'])
-            doc = yaml.safe_load(decrypted)
+            doc = yaml.load(decrypted, Loader=_YamlLoader)
         except Exception as e:
             logger.error(f"Failed to decrypt YAML secret: {e}")
             return 1
@@ -582,28 +594,29 @@ class SecretV2Commands(Command):
                 logger.warning(f"  Secret '{secret_name}' already exists, skipping")
                 continue
 
-            # Create new individual secret blob
-            self.secret_repo.execute("""
-                INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
-                VALUES (?, ?, ?, ?)
-            """, (profile, secret_name, encrypted, 'application/text'))
+            with self.secret_repo.transaction():
+                # Create new individual secret blob
+                self.secret_repo.execute("""
+                    INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
+                    VALUES (?, ?, ?, ?)
+                """, (profile, secret_name, encrypted, 'application/text'), commit=False)
 
-            secret_blob_id = self.secret_repo.query_one("""
-                SELECT id FROM secret_blobs WHERE id = last_insert_rowid()
-            """)['id']
+                secret_blob_id = self.secret_repo.query_one("""
+                    SELECT id FROM secret_blobs WHERE id = last_insert_rowid()
+                """)['id']
 
-            # Link to project
-            self.secret_repo.execute("""
-                INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
-                VALUES (?, ?, ?)
-            """, (project_id, secret_blob_id, profile))
-
-            # Record key assignments
-            for key_id in key_ids:
+                # Link to project
                 self.secret_repo.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                    INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
                     VALUES (?, ?, ?)
-                """, (secret_blob_id, key_id, os.environ.get('USER', 'unknown')))
+                """, (project_id, secret_blob_id, profile), commit=False)
+
+                # Record key assignments
+                for key_id in key_ids:
+                    self.secret_repo.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (secret_blob_id, key_id, DEFAULT_AUTHOR), commit=False)
 
             migrated_count += 1
 
@@ -611,17 +624,18 @@ class SecretV2Commands(Command):
         logger.info(f"\n✓ Migrated {migrated_count} secrets")
         logger.info("Deleting old YAML blob...")
 
-        self.secret_repo.execute("""
-            DELETE FROM project_secret_blobs
-            WHERE project_id = ? AND secret_blob_id = ? AND profile = ?
-        """, (project_id, yaml_secret['id'], profile))
+        with self.secret_repo.transaction():
+            self.secret_repo.execute("""
+                DELETE FROM project_secret_blobs
+                WHERE project_id = ? AND secret_blob_id = ? AND profile = ?
+            """, (project_id, yaml_secret['id'], profile), commit=False)
 
-        self.secret_repo.execute("""
-            DELETE FROM secret_blobs WHERE id = ?
-        """, (yaml_secret['id'],))
+            self.secret_repo.execute("""
+                DELETE FROM secret_blobs WHERE id = ?
+            """, (yaml_secret['id'],), commit=False)
 
-        logger.info(f"✓ Migration complete for {slug}")
-        self._audit_log('migrate-secrets', slug, f"migrated_{migrated_count}_secrets", {})
+            logger.info(f"✓ Migration complete for {slug}")
+            self._audit_log('migrate-secrets', slug, f"migrated_{migrated_count}_secrets", {}, commit=False)
         return 0
 
 
@@ -17,6 +17,7 @@ Usage examples:
   templedb env var set woofs_projects SECRET_KEY abc123 --secret --keys templedb-primary
   templedb env var set NODE_ENV production --global
   templedb env var set DEBUG true --tag backend
+  templedb env var export woofs_projects --format dotenv | templedb env var set-many shopUI
   templedb env var get woofs_projects SUPABASE_URL --target staging
   templedb env var list woofs_projects --target staging
   templedb env var export woofs_projects --target staging --format shell
@@ -26,6 +27,7 @@ Usage examples:
   templedb env var tag list woofs_projects
 """
 import re
+import shlex
 import sys
 import os
 import json
@@ -35,14 +37,16 @@ from pathlib import Path
 
 # Allow running standalone (e.g. python var.py) as well as via installed launcher
 try:
-    from db_utils import query_one, query_all, execute
+    from db_utils import query_one, query_all, execute, executemany, transaction
     from cli.core import Command
+    from config import DEFAULT_AUTHOR
 except ImportError:
     _src = str(Path(__file__).parent.parent.parent)
     if _src not in sys.path:
         sys.path.insert(0, _src)
-    from db_utils import query_one, query_all, execute
+    from db_utils import query_one, query_all, execute, executemany, transaction
     from cli.core import Command
+    from config import DEFAULT_AUTHOR
 
 logger = logging.getLogger(__name__)
 
@@ -257,11 +261,11 @@ class VarCommands(Command):
             sys.exit(1)
         return row
 
-    def _get_or_create_tag(self, tag_name: str) -> int:
+    def _get_or_create_tag(self, tag_name: str, commit: bool = True) -> int:
         row = self.query_one("SELECT id FROM tags WHERE name = ?", (tag_name,))
         if row:
             return row['id']
-        return self.execute("INSERT INTO tags (name) VALUES (?)", (tag_name,))
+        return self.execute("INSERT INTO tags (name) VALUES (?)", (tag_name,), commit=commit)
 
     def _get_tag(self, tag_name: str):
         row = self.query_one("SELECT * FROM tags WHERE name = ?", (tag_name,))
@@ -298,39 +302,38 @@ class VarCommands(Command):
             WHERE psb.project_id = ? AND sb.secret_name = ? AND psb.profile = ?
         """, (project_id, secret_name, profile))
 
-        actor = os.environ.get('USER', 'unknown')
-
-        if existing:
-            # Update existing blob
-            self.execute("""
-                UPDATE secret_blobs SET secret_blob = ?, updated_at = datetime('now')
-                WHERE id = ?
-            """, (encrypted, existing['id']))
-            # Re-assign keys
-            self.execute("DELETE FROM secret_key_assignments WHERE secret_blob_id = ?",
-                         (existing['id'],))
-            for kid in key_ids:
+        with transaction():
+            if existing:
+                # Update existing blob
                 self.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
-                    VALUES (?, ?, ?)
-                """, (existing['id'], kid, actor))
-        else:
-            # Insert new blob
-            self.execute("""
-                INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
-                VALUES (?, ?, ?, 'application/text')
-            """, (profile, secret_name, encrypted))
-            row = self.query_one("SELECT id FROM secret_blobs WHERE id = last_insert_rowid()")
-            secret_blob_id = row['id']
-            self.execute("""
-                INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
-                VALUES (?, ?, ?)
-            """, (project_id, secret_blob_id, profile))
-            for kid in key_ids:
+                    UPDATE secret_blobs SET secret_blob = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                """, (encrypted, existing['id']), commit=False)
+                # Re-assign keys
+                self.execute("DELETE FROM secret_key_assignments WHERE secret_blob_id = ?",
+                             (existing['id'],), commit=False)
+                for kid in key_ids:
+                    self.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (existing['id'], kid, DEFAULT_AUTHOR), commit=False)
+            else:
+                # Insert new blob
+                self.execute("""
+                    INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
+                    VALUES (?, ?, ?, 'application/text')
+                """, (profile, secret_name, encrypted), commit=False)
+                row = self.query_one("SELECT id FROM secret_blobs WHERE id = last_insert_rowid()")
+                secret_blob_id = row['id']
                 self.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                    INSERT INTO project_secret_blobs (project_id, secret_blob_id, profile)
                     VALUES (?, ?, ?)
-                """, (secret_blob_id, kid, actor))
+                """, (project_id, secret_blob_id, profile), commit=False)
+                for kid in key_ids:
+                    self.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (secret_blob_id, kid, DEFAULT_AUTHOR), commit=False)
 
     def _secret_get(self, project_id: int, profile: str, secret_name: str):
         """Get and decrypt a single secret. Returns plaintext str or None."""
@@ -372,8 +375,6 @@ class VarCommands(Command):
             recipients.append(rec)
 
         encrypted = _age_encrypt(value.encode('utf-8'), recipients)
-        actor = os.environ.get('USER', 'unknown')
-
         existing = self.query_one("""
             SELECT sb.id FROM secret_blobs sb
             WHERE sb.secret_name = ? AND sb.profile = ?
@@ -382,29 +383,30 @@ class VarCommands(Command):
               )
         """, (secret_name, profile))
 
-        if existing:
-            self.execute("""
-                UPDATE secret_blobs SET secret_blob = ?, updated_at = datetime('now')
-                WHERE id = ?
-            """, (encrypted, existing['id']))
-            self.execute("DELETE FROM secret_key_assignments WHERE secret_blob_id = ?",
-                         (existing['id'],))
-            for kid in key_ids:
+        with transaction():
+            if existing:
                 self.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
-                    VALUES (?, ?, ?)
-                """, (existing['id'], kid, actor))
-        else:
-            self.execute("""
-                INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
-                VALUES (?, ?, ?, 'application/text')
-            """, (profile, secret_name, encrypted))
-            row = self.query_one("SELECT id FROM secret_blobs WHERE id = last_insert_rowid()")
-            for kid in key_ids:
+                    UPDATE secret_blobs SET secret_blob = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                """, (encrypted, existing['id']), commit=False)
+                self.execute("DELETE FROM secret_key_assignments WHERE secret_blob_id = ?",
+                             (existing['id'],), commit=False)
+                for kid in key_ids:
+                    self.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (existing['id'], kid, DEFAULT_AUTHOR), commit=False)
+            else:
                 self.execute("""
-                    INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
-                    VALUES (?, ?, ?)
-                """, (row['id'], kid, actor))
+                    INSERT INTO secret_blobs (profile, secret_name, secret_blob, content_type)
+                    VALUES (?, ?, ?, 'application/text')
+                """, (profile, secret_name, encrypted), commit=False)
+                row = self.query_one("SELECT id FROM secret_blobs WHERE id = last_insert_rowid()")
+                for kid in key_ids:
+                    self.execute("""
+                        INSERT INTO secret_key_assignments (secret_blob_id, key_id, added_by)
+                        VALUES (?, ?, ?)
+                    """, (row['id'], kid, DEFAULT_AUTHOR), commit=False)
 
     def _global_secret_get(self, profile: str, secret_name: str):
         """Retrieve and decrypt a global (project-less) secret. Returns str or None."""
@@ -515,6 +517,50 @@ class VarCommands(Command):
         print(f"set {key} [{scope_label}]")
         return 0
 
+    def var_set_many(self, args) -> int:
+        """Set KEY=VALUE lines from stdin (dotenv export format) in one transaction."""
+        target = args.target or 'default'
+        items = []
+        for lineno, line in enumerate(sys.stdin, 1):
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            key, sep, value = line.partition('=')
+            key = key.strip()
+            if key.startswith('export '):
+                key = key[len('export '):].strip()
+            if not sep or not key:
+                print(f"error: line {lineno}: expected KEY=VALUE", file=sys.stderr)
+                return 1
+            items.append((_var_key(target, key), value))
+
+        if args.global_scope:
+            scope_type, scope_id = 'global', None
+            scope_label = "global"
+        elif getattr(args, 'tag', None):
+            scope_type, scope_id = 'tag', None  # resolved inside the transaction
+            scope_label = f"tag:{args.tag}"
+        elif getattr(args, 'project', None):
+            scope_type, scope_id = 'project', self._get_project(args.project)['id']
+            scope_label = args.project
+        else:
+            print("error: specify a project slug, --global, or --tag", file=sys.stderr)
+            return 1
+        if target != 'default' and scope_type != 'tag':
+            scope_label += f" ({target})"
+
+        with transaction():
+            if scope_type == 'tag':
+                scope_id = self._get_or_create_tag(args.tag, commit=False)
+            executemany("""
+                INSERT INTO environment_variables (scope_type, scope_id, var_name, var_value)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(scope_type, scope_id, var_name)
+                DO UPDATE SET var_value = excluded.var_value, updated_at = CURRENT_TIMESTAMP
+            """, [(scope_type, scope_id, name, value) for name, value in items], commit=False)
+        print(f"set {len(items)} variable(s) [{scope_label}]")
+        return 0
+
     # ------------------------------------------------------------------
     # var get
     # ------------------------------------------------------------------
@@ -623,18 +669,21 @@ class VarCommands(Command):
         if getattr(args, 'json', False):
             from cli.json_output import emit_list
             project_slug = getattr(args, 'project', None)
+            # sqlite3.Row cursors, not query_all: each row becomes exactly one
+            # output dict instead of a row dict plus an output dict
+            conn = self.get_connection()
             if project_slug:
                 project = self._get_project(project_slug)
-                rows = self.query_all("""
-                    SELECT var_name, var_value, is_secret, description
+                rows = conn.execute("""
+                    SELECT var_name, var_value, is_secret, description,
+                           'project' AS scope_type
                     FROM environment_variables
                     WHERE scope_type = 'project' AND scope_id = ?
                     ORDER BY var_name
                 """, (project['id'],))
             else:
-                rows = self.query_all("""
-                    SELECT var_name, var_value, is_secret, description,
-                           scope_type, scope_id
+                rows = conn.execute("""
+                    SELECT var_name, var_value, is_secret, description, scope_type
                     FROM environment_variables
                     ORDER BY scope_type, var_name
                 """)
@@ -643,10 +692,10 @@ class VarCommands(Command):
                     "name": r['var_name'],
                     "value": "[secret]" if r['is_secret'] else r['var_value'],
                     "secret": bool(r['is_secret']),
-                    "description": r.get('description'),
-                    "scope": r.get('scope_type', 'project'),
+                    "description": r['description'],
+                    "scope": r['scope_type'],
                 }
-                for r in (rows or [])
+                for r in rows
             ]
             return emit_list(args, items)
 
@@ -948,7 +997,7 @@ class VarCommands(Command):
                     tf.write('\n')
                 tmp = tf.name
             try:
-                _sp.run([editor, tmp], check=True)
+                _sp.run([*shlex.split(editor), tmp], check=True)
                 new_val = open(tmp).read().lstrip('').rstrip('\n')
                 # Strip leading comment lines
                 lines = new_val.splitlines()
@@ -991,7 +1040,7 @@ class VarCommands(Command):
                 tf.write('\n')
             tmp = tf.name
         try:
-            _sp.run([editor, tmp], check=True)
+            _sp.run([*shlex.split(editor), tmp], check=True)
             new_val = open(tmp).read().rstrip('\n')
         finally:
             os.unlink(tmp)
@@ -1070,12 +1119,13 @@ class VarCommands(Command):
         return self.tag_list(args)
 
     def tag_add(self, args) -> int:
-        tag_id = self._get_or_create_tag(args.tag_name)
-        for slug in args.projects:
-            project = self._get_project(slug)
-            self.execute("""
+        project_ids = [self._get_project(slug)['id'] for slug in args.projects]
+        with transaction():
+            tag_id = self._get_or_create_tag(args.tag_name, commit=False)
+            executemany("""
                 INSERT OR IGNORE INTO project_tags (project_id, tag_id) VALUES (?, ?)
-            """, (project['id'], tag_id))
+            """, [(project_id, tag_id) for project_id in project_ids], commit=False)
+        for slug in args.projects:
             print(f"tagged {slug} as {args.tag_name}")
         return 0
 
@@ -1148,6 +1198,13 @@ def register_subcommands(parent_subparsers, cli, prefix='env'):
     p.add_argument('--description', default=None, help='Description for --nixos keys')
     cli.commands[f'{prefix}.var.set'] = cmd.var_set
 
+    p = subparsers.add_parser('set-many', help='Set variables from KEY=VALUE lines on stdin')
+    p.add_argument('project', nargs='?', help='Project slug (omit with --global or --tag)')
+    p.add_argument('--target', '-t', default=None, help='Deployment target (staging, production, ...)')
+    p.add_argument('--global', dest='global_scope', action='store_true', help='Set at global scope')
+    p.add_argument('--tag', default=None, help='Set at tag scope (creates tag if new)')
+    cli.commands[f'{prefix}.var.set-many'] = cmd.var_set_many
+
     p = subparsers.add_parser('get', help='Get a variable (with scope resolution)')
     p.add_argument('project', nargs='?', help='Project slug')
     p.add_argument('key', help='Variable name')
@@ -1233,6 +1290,14 @@ def register(cli):
     p.add_argument('--description', default=None, help='Description for --nixos keys')
     cli.commands['var.set'] = cmd.var_set
 
+    # --- var set-many ---
+    p = subparsers.add_parser('set-many', help='Set variables from KEY=VALUE lines on stdin')
+    p.add_argument('project', nargs='?', help='Project slug (omit with --global or --tag)')
+    p.add_argument('--target', '-t', default=None, help='Deployment target (staging, production, ...)')
+    p.add_argument('--global', dest='global_scope', action='store_true', help='Set at global scope')
+    p.add_argument('--tag', default=None, help='Set at tag scope (creates tag if new)')
+    cli.commands['var.set-many'] = cmd.var_set_many
+
     # --- var get ---
     p = subparsers.add_parser('get', help='Get a variable (with scope resolution)')
     p.add_argument('project', nargs='?', help='Project slug')
@@ -16,10 +16,11 @@ Usage in a command:
         return emit_error(args, "NOT_FOUND", "Project 'foo' not found",
                           solution="Run: templedb project list")
 """
-import json
 import sys
 from typing import Any, Callable, Optional
 
+from json_utils import dumps as _dumps
+
 
 def emit(args, data: dict, human_fn: Optional[Callable[[dict], None]] = None) -> int:
     """
@@ -29,20 +30,22 @@ def emit(args, data: dict, human_fn: Optional[Callable[[dict], None]] = None) ->
         args:     Parsed argparse namespace (checked for .json flag)
         data:     Dict to serialize. Will have {"ok": true} merged in.
         human_fn: Called with data when not in JSON mode. If None, data is
-                  printed as pretty JSON regardless (fallback).
+                  printed as JSON regardless (fallback): indented on a
+                  terminal, compact when stdout is a pipe or file.
 
     Returns:
         0 (success exit code)
     """
     if getattr(args, 'json', False):
         payload = {"ok": True, **data}
-        print(json.dumps(payload))
+        print(_dumps(payload))
     else:
         if human_fn:
             human_fn(data)
         else:
-            # No human formatter — just print the dict cleanly
-            print(json.dumps(data, indent=2))
+            # No human formatter — just print the dict cleanly (indented for
+            # a terminal, compact when piped)
+            print(_dumps(data, indent=sys.stdout.isatty()))
     return 0
 
 
@@ -73,7 +76,7 @@ def emit_error(
         if solution:
             payload["solution"] = solution
         payload.update(details)
-        print(json.dumps(payload), file=sys.stderr)
+        print(_dumps(payload), file=sys.stderr)
     else:
         print(f"Error: {message}", file=sys.stderr)
         if solution:
@@ -94,10 +97,10 @@ def emit_list(args, items: list, human_fn: Optional[Callable[[list], None]] = No
         0
     """
     if getattr(args, 'json', False):
-        print(json.dumps({"ok": True, "items": items, "count": len(items)}))
+        print(_dumps({"ok": True, "items": items, "count": len(items)}))
     else:
         if human_fn:
             human_fn(items)
         else:
-            print(json.dumps(items, indent=2))
+            print(_dumps(items, indent=sys.stdout.isatty()))
     return 0
@@ -28,6 +28,10 @@ def _get_db_path():
 
 DB_PATH = _get_db_path()
 
+# Compiled statements kept per connection (sqlite3 defaults to 128); the
+# importer and VCS paths cycle through more distinct statements than that
+STATEMENT_CACHE_SIZE = 1000
+
 # Thread-local storage for connections
 _thread_local = threading.local()
 
@@ -35,7 +39,9 @@ _thread_local = threading.local()
 def get_connection() -> sqlite3.Connection:
     """Get thread-local database connection (connection pooling)"""
     if not hasattr(_thread_local, 'connection'):
-        _thread_local.connection = sqlite3.connect(DB_PATH, timeout=30.0)
+        _thread_local.connection = sqlite3.connect(
+            DB_PATH, timeout=30.0, cached_statements=STATEMENT_CACHE_SIZE
+        )
         _thread_local.connection.row_factory = sqlite3.Row
         # Enable foreign keys (required for CASCADE deletes)
         _thread_local.connection.execute("PRAGMA foreign_keys=ON")
@@ -62,7 +68,9 @@ def get_simple_connection(db_path: str = None, row_factory: bool = False) -> sql
         Configured SQLite connection with WAL mode and optimal settings
     """
     path = db_path or DB_PATH
-    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+    conn = sqlite3.connect(
+        path, timeout=30.0, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+    )
 
     if row_factory:
         conn.row_factory = sqlite3.Row
@@ -6,6 +6,7 @@ Generates direnv-compatible output with secrets, env vars, compound values,
 and optional Nix environment loading.
 """
 
+import hashlib
 import os
 import re
 import sqlite3
@@ -15,6 +16,18 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+try:
+    import yaml
+    YAML_AVAILABLE = True
+    # libyaml-backed loader when PyYAML was built with it
+    _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    YAML_AVAILABLE = False
+
+# Opt-in: "1" keeps decrypted secret docs under $XDG_RUNTIME_DIR so repeat
+# evaluations of an unchanged blob skip sops
+SECRET_CACHE_ENV = "TEMPLEDB_SECRET_CACHE"
+
 
 class TempledbError(RuntimeError):
     pass
@@ -26,9 +39,36 @@ def bail(msg: str) -> None:
 
 def shell_escape(s: str) -> str:
     """Wrap in single quotes, escape internal ' as: '\\'' (POSIX sh safe)"""
-    if s == "":
-        return "''"
-    return "'" + s.replace("'", r"'\''") + "'"
+    if "'" in s:
+        s = s.replace("'", r"'\''")
+    return "'" + s + "'"
+
+
+def _yaml_env_section(data):
+    """(yaml.safe_load(data) or {}).get("env"), constructing only that subtree.
+
+    The document is still composed (in C when PyYAML has libyaml), but Python
+    objects are built just for the env mapping, not every section of the doc.
+    """
+    if not YAML_AVAILABLE:
+        raise ImportError("PyYAML is required to read secrets")
+    loader = _YamlLoader(data)
+    try:
+        root = loader.get_single_node()
+        if root is None:
+            return None
+        if isinstance(root, yaml.MappingNode) and not any(
+            key.tag == "tag:yaml.org,2002:merge" for key, _ in root.value
+        ):
+            env_node = None
+            for key, value in root.value:
+                if isinstance(key, yaml.ScalarNode) and loader.construct_object(key) == "env":
+                    env_node = value  # last duplicate wins, as with a full load
+            return loader.construct_document(env_node) if env_node is not None else None
+        doc = loader.construct_document(root)
+    finally:
+        loader.dispose()
+    return (doc or {}).get("env")
 
 
 def get_project_id(conn: sqlite3.Connection, slug: str) -> int:
@@ -57,96 +97,222 @@ def _run_sops(args: list, stdin_bytes: Optional[bytes] = None) -> bytes:
 
 
 def sops_decrypt_yaml(sops_yaml: bytes) -> bytes:
-    return _run_sops(["--decrypt", "/dev/stdin"], stdin_bytes=sops_yaml)
+    # sops infers the store from the file extension; /dev/stdin has none and
+    # would be read as a binary-store document
+    return _run_sops(
+        ["--decrypt", "--input-type", "yaml", "--output-type", "yaml", "/dev/stdin"],
+        stdin_bytes=sops_yaml,
+    )
+
+
+def _secret_cache_path(sops_yaml: bytes) -> Optional[Path]:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if os.environ.get(SECRET_CACHE_ENV) != "1" or not runtime_dir:
+        return None
+    return Path(runtime_dir) / "templedb-secrets" / hashlib.sha256(sops_yaml).hexdigest()
+
+
+def sops_decrypt_yaml_cached(sops_yaml: bytes) -> bytes:
+    """sops_decrypt_yaml, reusing the per-session plaintext cache when enabled.
+
+    Keyed by the SHA-256 of the encrypted blob, so an edited secret never
+    serves stale plaintext. Off by default: a hit skips the age identity,
+    including hardware-key touch prompts, until the runtime dir is cleared.
+    """
+    cache_path = _secret_cache_path(sops_yaml)
+    if cache_path is None:
+        return sops_decrypt_yaml(sops_yaml)
+    try:
+        return cache_path.read_bytes()
+    except OSError:
+        pass
+
+    plaintext = sops_decrypt_yaml(sops_yaml)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(plaintext)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Best-effort; decryption already succeeded
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+    return plaintext
+
+
+def _write_if_changed(path: Path, text: str) -> None:
+    """Write text unless the file already holds it; an untouched mtime keeps
+    nix-direnv's cached flake evaluation valid"""
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return
+    except OSError:
+        pass
+    path.write_bytes(data)
 
 
 def get_git_info(cwd: Path) -> tuple:
     """Get current git branch and ref. Returns (branch, ref), either can be None."""
     try:
-        git_check = subprocess.run(
-            ["git", "rev-parse", "--git-dir"],
+        # One rev-parse answers both; --abbrev-ref only applies to the args
+        # after it. Outside a repo or on an unborn branch it fails outright.
+        proc = subprocess.run(
+            ["git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD"],
             cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
         )
-        if git_check.returncode != 0:
+        if proc.returncode != 0:
             return (None, None)
-
-        branch_proc = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
-        )
-        branch = branch_proc.stdout.decode("utf-8").strip() if branch_proc.returncode == 0 else None
-
-        ref_proc = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
-        )
-        ref = ref_proc.stdout.decode("utf-8").strip() if ref_proc.returncode == 0 else None
-
+        ref, branch = proc.stdout.decode("utf-8").split()
         return (branch, ref)
     except (FileNotFoundError, Exception):
         return (None, None)
 
 
-def resolve_template(
-    conn: sqlite3.Connection, slug: str, profile: str,
-    template: str, _resolving_stack: Optional[set] = None,
-) -> str:
-    """Resolve ${secret:KEY}, ${env:KEY}, ${compound:KEY} in a template string."""
-    import yaml
-
-    if _resolving_stack is None:
-        _resolving_stack = set()
-
-    pattern = r'\$\{(secret|env|compound):([^}]+)\}'
-
-    def replacer(match):
-        var_type = match.group(1)
-        var_key = match.group(2)
-
-        if var_type == "secret":
-            pid = get_project_id(conn, slug)
-            row = conn.execute(
-                "SELECT secret_blob FROM secret_blobs WHERE project_id=? AND profile=?",
-                (pid, profile),
-            ).fetchone()
-            if not row:
-                bail(f"no secrets for {slug} profile {profile}")
-            plaintext = sops_decrypt_yaml(row["secret_blob"])
-            doc = yaml.safe_load(plaintext) or {}
-            env_map = doc.get("env") or {}
-            if var_key not in env_map:
-                bail(f"secret key '{var_key}' not found in {slug} profile {profile}")
-            return str(env_map[var_key])
-
-        elif var_type == "env":
-            row = conn.execute(
-                "SELECT value FROM env_vars WHERE key = ? AND environment = ?",
-                (var_key, "default"),
+_TEMPLATE_RE = re.compile(r'\$\{(secret|env|compound):([^}]+)\}')
+
+
+class _TemplateResolver:
+    """Resolves compound templates for one project/profile.
+
+    The env vars, compound templates and decrypted secrets that references
+    can hit are each read once, on first use, instead of per reference, and
+    each compound is expanded once. Callers that already hold some of them
+    can pass them in.
+    """
+
+    def __init__(
+        self, conn: sqlite3.Connection, slug: str, profile: str,
+        project_id: Optional[int] = None,
+        env_values: Optional[dict] = None,
+        compound_templates: Optional[dict] = None,
+        secret_env: Optional[dict] = None,
+    ):
+        self.conn = conn
+        self.slug = slug
+        self.profile = profile
+        self._project_id = project_id
+        self._env_values = env_values
+        self._compound_templates = compound_templates
+        self._secret_env = secret_env
+        self._resolved = {}  # compound key -> expanded value
+
+    def project_id(self) -> int:
+        if self._project_id is None:
+            self._project_id = get_project_id(self.conn, self.slug)
+        return self._project_id
+
+    def env_values(self) -> dict:
+        if self._env_values is None:
+            self._env_values = {
+                row["key"]: row["value"] for row in self.conn.execute(
+                    "SELECT key, value FROM env_vars WHERE environment = ?", ("default",)
+                )
+            }
+        return self._env_values
+
+    def compound_templates(self) -> dict:
+        if self._compound_templates is None:
+            templates = {}
+            for row in self.conn.execute(
+                "SELECT key, value_template FROM compound_values WHERE project_id=? AND profile=?",
+                (self.project_id(), self.profile),
+            ):
+                templates.setdefault(row["key"], row["value_template"])
+            self._compound_templates = templates
+        return self._compound_templates
+
+    def secret_env(self) -> dict:
+        if self._secret_env is None:
+            row = self.conn.execute(
+                """SELECT sb.secret_blob
+                   FROM project_secret_blobs psb
+                   JOIN secret_blobs sb ON psb.secret_blob_id = sb.id
+                   WHERE psb.project_id = ? AND psb.profile = ?
+                   LIMIT 1""",
+                (self.project_id(), self.profile),
             ).fetchone()
             if not row:
-                bail(f"env var '{var_key}' not found (environment: default)")
-            return row["value"]
-
-        elif var_type == "compound":
-            cycle_key = f"{slug}:{profile}:{var_key}"
-            if cycle_key in _resolving_stack:
-                bail(f"circular dependency detected in compound value: {var_key}")
-            _resolving_stack.add(cycle_key)
-            try:
-                pid = get_project_id(conn, slug)
-                row = conn.execute(
-                    "SELECT value_template FROM compound_values WHERE project_id=? AND profile=? AND key=?",
-                    (pid, profile, var_key),
-                ).fetchone()
-                if not row:
+                bail(f"no secrets for {self.slug} profile {self.profile}")
+            plaintext = sops_decrypt_yaml_cached(row["secret_blob"])
+            self._secret_env = _yaml_env_section(plaintext) or {}
+        return self._secret_env
+
+    def resolve(self, template: str, _resolving_stack: Optional[set] = None) -> str:
+        """Substitute every reference in template.
+
+        Nested compounds are expanded with an explicit stack rather than
+        recursion, left to right, so errors surface in the same order they
+        appear. Each compound is expanded once; later references reuse it.
+        """
+        if "${" not in template:
+            return template
+        resolving = set(_resolving_stack or ())
+        slug, profile = self.slug, self.profile
+        # Frames: [compound key (None for the root), template, matches, parts, pos]
+        stack = [[None, template, _TEMPLATE_RE.finditer(template), [], 0]]
+        while True:
+            frame = stack[-1]
+            key, text, matches, parts, pos = frame
+            match = next(matches, None)
+            if match is None:
+                parts.append(text[pos:])
+                value = "".join(parts)
+                stack.pop()
+                if not stack:
+                    return value
+                resolving.discard(f"{slug}:{profile}:{key}")
+                self._resolved[key] = value
+                stack[-1][3].append(value)
+                continue
+
+            parts.append(text[pos:match.start()])
+            frame[4] = match.end()
+            var_type, var_key = match.groups()
+
+            if var_type == "secret":
+                env_map = self.secret_env()
+                if var_key not in env_map:
+                    bail(f"secret key '{var_key}' not found in {slug} profile {profile}")
+                parts.append(str(env_map[var_key]))
+
+            elif var_type == "env":
+                env_values = self.env_values()
+                if var_key not in env_values:
+                    bail(f"env var '{var_key}' not found (environment: default)")
+                parts.append(env_values[var_key])
+
+            elif var_key in self._resolved:
+                parts.append(self._resolved[var_key])
+
+            else:
+                cycle_key = f"{slug}:{profile}:{var_key}"
+                if cycle_key in resolving:
+                    bail(f"circular dependency detected in compound value: {var_key}")
+                templates = self.compound_templates()
+                if var_key not in templates:
                     bail(f"compound value '{var_key}' not found in {slug} profile {profile}")
-                return resolve_template(conn, slug, profile, row["value_template"], _resolving_stack)
-            finally:
-                _resolving_stack.discard(cycle_key)
+                nested = templates[var_key]
+                if "${" not in nested:
+                    self._resolved[var_key] = nested
+                    parts.append(nested)
+                else:
+                    resolving.add(cycle_key)
+                    stack.append([var_key, nested, _TEMPLATE_RE.finditer(nested), [], 0])
 
-        return match.group(0)
 
-    return re.sub(pattern, replacer, template)
+def resolve_template(
+    conn: sqlite3.Connection, slug: str, profile: str,
+    template: str, _resolving_stack: Optional[set] = None,
+) -> str:
+    """Resolve ${secret:KEY}, ${env:KEY}, ${compound:KEY} in a template string."""
+    if "${" not in template:
+        return template
+    return _TemplateResolver(conn, slug, profile).resolve(template, _resolving_stack)
 
 
 def _validate_direnv_output(lines: list) -> list:
@@ -174,8 +340,6 @@ def cmd_direnv(
     auto_reload: bool = True, validate: bool = True,
 ) -> None:
     """Generate direnv-compatible output for a project."""
-    import yaml
-
     cwd = Path.cwd()
     output_lines = []
 
@@ -203,8 +367,32 @@ def cmd_direnv(
     if ref_override is not None:
         git_ref = ref_override
 
-    # Validate project exists
-    row = conn.execute("SELECT id FROM projects WHERE slug = ?", (slug,)).fetchone()
+    # Auto-detect profile from branch (reported once the project is known)
+    detected_profile = None
+    if profile == "default" and git_branch:
+        if git_branch in ["main", "master"]:
+            detected_profile = "production"
+        elif git_branch in ["develop", "dev", "development"]:
+            detected_profile = "development"
+        elif git_branch.startswith("staging"):
+            detected_profile = "staging"
+        if detected_profile:
+            profile = detected_profile
+
+    # Validate project exists, fetching its nix config and secret blob for the
+    # profile in the same query
+    row = conn.execute(
+        """SELECT p.id, nc.id AS nix_id, nc.nix_text, nc.flake_text, nc.flake_lock,
+                  sb.secret_blob
+           FROM projects p
+           LEFT JOIN nix_configs nc ON nc.project_id = p.id AND nc.profile = :profile
+           LEFT JOIN (project_secret_blobs psb
+                      JOIN secret_blobs sb ON psb.secret_blob_id = sb.id)
+                  ON psb.project_id = p.id AND psb.profile = :profile
+           WHERE p.slug = :slug
+           LIMIT 1""",
+        {"slug": slug, "profile": profile},
+    ).fetchone()
     if not row:
         bail(f"unknown project slug: {slug} (tried to infer from current directory)")
     pid = int(row["id"])
@@ -213,18 +401,8 @@ def cmd_direnv(
         emit(f"# Detected git branch: {git_branch}", to_stderr=True)
     if git_ref:
         emit(f"# Detected git ref: {git_ref[:8]}", to_stderr=True)
-
-    # Auto-detect profile from branch
-    if profile == "default" and git_branch:
-        if git_branch in ["main", "master"]:
-            profile = "production"
-            emit(f"# Auto-detected profile 'production' from branch '{git_branch}'", to_stderr=True)
-        elif git_branch in ["develop", "dev", "development"]:
-            profile = "development"
-            emit(f"# Auto-detected profile 'development' from branch '{git_branch}'", to_stderr=True)
-        elif git_branch.startswith("staging"):
-            profile = "staging"
-            emit(f"# Auto-detected profile 'staging' from branch '{git_branch}'", to_stderr=True)
+    if detected_profile:
+        emit(f"# Auto-detected profile '{detected_profile}' from branch '{git_branch}'", to_stderr=True)
 
     # Header
     emit(f"# .envrc - Generated by TempleDB")
@@ -247,22 +425,16 @@ def cmd_direnv(
     # Nix environment
     if load_nix:
         emit("# --- Nix Environment ---")
-        nix_row = conn.execute(
-            "SELECT nix_text, flake_text, flake_lock FROM nix_configs WHERE project_id=? AND profile=?",
-            (pid, profile),
-        ).fetchone()
-        if nix_row:
-            if nix_row["flake_text"]:
+        if row["nix_id"] is not None:
+            if row["flake_text"]:
                 nix_dir = cwd / ".templedb-nix"
                 nix_dir.mkdir(exist_ok=True)
-                flake_path = nix_dir / "flake.nix"
-                flake_path.write_text(nix_row["flake_text"], encoding="utf-8")
-                if nix_row["flake_lock"]:
-                    lock_path = nix_dir / "flake.lock"
-                    lock_path.write_text(nix_row["flake_lock"], encoding="utf-8")
+                _write_if_changed(nix_dir / "flake.nix", row["flake_text"])
+                if row["flake_lock"]:
+                    _write_if_changed(nix_dir / "flake.lock", row["flake_lock"])
                 emit(f"use flake {shell_escape(str(nix_dir))}")
                 emit(f"# Using flake from TempleDB", to_stderr=True)
-            elif nix_row["nix_text"]:
+            elif row["nix_text"]:
                 emit("use nix")
                 emit("# Using nix environment", to_stderr=True)
             else:
@@ -273,20 +445,14 @@ def cmd_direnv(
 
     # Secrets
     emit("# --- Secrets (from SOPS-encrypted store) ---")
-    secret_row = conn.execute(
-        """SELECT sb.secret_blob FROM secret_blobs sb
-           JOIN project_secret_blobs psb ON psb.secret_blob_id = sb.id
-           WHERE psb.project_id = ? AND psb.profile = ?""",
-        (pid, profile),
-    ).fetchone()
-
     secret_count = 0
-    if secret_row:
+    secret_env = None  # handed to the compound resolver so the blob is decrypted once
+    if row["secret_blob"] is not None:
         try:
-            plaintext = sops_decrypt_yaml(secret_row["secret_blob"])
-            doc = yaml.safe_load(plaintext) or {}
-            env_map = doc.get("env") or {}
+            plaintext = sops_decrypt_yaml_cached(row["secret_blob"])
+            env_map = _yaml_env_section(plaintext) or {}
             if isinstance(env_map, dict):
+                secret_env = env_map
                 for k, v in env_map.items():
                     emit(f"export {k}={shell_escape(str(v))}")
                     secret_count += 1
@@ -304,11 +470,14 @@ def cmd_direnv(
     # Environment variables
     emit(f"# --- Environment Variables (environment: {environment}) ---")
     env_count = 0
+    template_env = None  # ${env:...} always reads the default environment
     try:
         env_rows = conn.execute(
             "SELECT key, value FROM env_vars WHERE environment = ?",
             (environment,),
         ).fetchall()
+        if environment == "default":
+            template_env = {env_row["key"]: env_row["value"] for env_row in env_rows}
         for env_row in env_rows:
             emit(f"export {env_row['key']}={shell_escape(env_row['value'])}")
             env_count += 1
@@ -332,9 +501,17 @@ def cmd_direnv(
             "SELECT key, value_template FROM compound_values WHERE project_id=? AND profile=?",
             (pid, profile),
         ).fetchall()
+        compound_templates = {}
+        for compound_row in compound_rows:
+            compound_templates.setdefault(compound_row["key"], compound_row["value_template"])
+        resolver = _TemplateResolver(
+            conn, slug, profile, project_id=pid,
+            env_values=template_env, compound_templates=compound_templates,
+            secret_env=secret_env,
+        )
         for compound_row in compound_rows:
             try:
-                resolved = resolve_template(conn, slug, profile, compound_row["value_template"])
+                resolved = resolver.resolve(compound_row["value_template"])
                 emit(f"export {compound_row['key']}={shell_escape(resolved)}")
                 compound_count += 1
             except TempledbError as e:
@@ -5,10 +5,14 @@ Project importer - Unified Python importer for TempleDB
 Replaces all Node.js populate_*.cjs scripts with a single,
 modular Python implementation.
 """
+import json
+import os
 import sys
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, List
-from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Dict, List, Tuple
+from dataclasses import dataclass, asdict
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from db_utils import query_one, query_all, execute, executemany, get_connection, transaction
@@ -18,9 +22,82 @@ from importer.git_analyzer import GitAnalyzer
 from importer.content import ContentStore, FileContent
 from importer.sql_analyzer import SqlAnalyzer, SqlObject
 from importer.dependency_analyzer import DependencyAnalyzer, Dependency
-
-
-@dataclass
+from json_utils import dumps as _dumps
+
+# Extensions an import may omit, in resolution priority order
+_EXT_PROBE = ('.py', '.js', '.ts', '.tsx', '.jsx')
+
+# Below this many files the process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+# Files per worker task (amortizes IPC overhead for small files)
+ANALYSIS_BATCH_SIZE = 16
+# Buffered file contents per executemany in _store_file_contents
+STORE_BATCH_SIZE = 256
+# Files modified this close to change detection may change again within the
+# filesystem's mtime granularity, so their stat isn't cached
+STAT_RACY_WINDOW_NS = 2_000_000_000
+# Keys of each SQL object entry in 'sql_object' file metadata
+_SQL_OBJ_KEYS = ('type', 'name', 'schema', 'has_rls', 'has_foreign_keys')
+# Content hashes per sql_analysis_cache lookup (stays under SQLite's variable limit)
+CACHE_LOOKUP_CHUNK = 500
+
+
+def _analyze_sql_batch(paths: List[Path]) -> List[Tuple[Optional[List[SqlObject]], Optional[str]]]:
+    """Worker: analyze a batch of SQL files, returning (objects, error) per file"""
+    results = []
+    for path in paths:
+        try:
+            results.append((SqlAnalyzer.analyze_sql_file(path), None))
+        except FileNotFoundError:
+            results.append((None, None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _analyze_dependency_batch(items: List[Tuple[Path, str]]) -> List[Optional[List[Dependency]]]:
+    """Worker: read a batch of (path, file_type) pairs and extract their dependencies"""
+    results = []
+    for file_path, file_type in items:
+        try:
+            content = file_path.read_text(encoding='utf-8', errors='ignore')
+        except Exception:
+            results.append(None)
+            continue
+        results.append(DependencyAnalyzer.analyze_file(file_path, content, file_type))
+    return results
+
+
+def _map_batched(func: Callable[[list], list], items: list) -> Iterator:
+    """Apply a batch worker over items, yielding per-item results in input order.
+
+    Large inputs fan out to a process pool (the regex work holds the GIL) with
+    at most 2 * workers batches in flight to cap memory; small inputs run here.
+    Database writes stay with the caller since connections don't cross processes.
+    """
+    batches = [items[i:i + ANALYSIS_BATCH_SIZE] for i in range(0, len(items), ANALYSIS_BATCH_SIZE)]
+
+    if len(items) < PARALLEL_MIN_FILES:
+        for batch in batches:
+            yield from func(batch)
+        return
+
+    # Deferred: pulls in multiprocessing, which every CLI start would otherwise pay for
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = os.cpu_count() or 1
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(func, batch))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+@dataclass(slots=True)
 class ImportStats:
     """Statistics from import operation"""
     total_files_scanned: int = 0
@@ -36,10 +113,13 @@ class ImportStats:
 class ProjectImporter:
     """Main project importer - orchestrates file scanning, content storage, and metadata extraction"""
 
-    def __init__(self, project_slug: str, project_root: str, dry_run: bool = False):
+    def __init__(self, project_slug: str, project_root: str, dry_run: bool = False,
+                 fast: bool = False):
         self.project_slug = project_slug
         self.project_root = Path(project_root).resolve()
         self.dry_run = dry_run
+        # Trade crash durability for throughput during the import transaction
+        self.fast = fast
         self.stats = ImportStats()
 
         # Initialize components
@@ -60,6 +140,16 @@ class ProjectImporter:
         # Storage for SQL objects (analyzed before metadata population)
         self.sql_objects_by_file = {}
 
+        # Content hash per relative path, filled while storing contents
+        self.content_hashes: Dict[str, str] = {}
+
+        # Change tracking against the previous import (see _detect_changed_files)
+        self.previous_hashes: Dict[str, Optional[str]] = {}
+        self.previous_commits: Dict[str, Tuple[int, Optional[str]]] = {}  # path -> (file id, last_commit_hash)
+        self.new_paths: set = set()
+        self.changed_paths: List[str] = []
+        self.file_ids: Dict[str, int] = {}
+
     def _load_file_types(self) -> Dict[str, int]:
         """Load file type IDs from database"""
         file_types = {}
@@ -68,6 +158,21 @@ class ProjectImporter:
             file_types[row['type_name']] = row['id']
         return file_types
 
+    def _enter_fast_mode(self) -> Dict[str, str]:
+        """Disable fsync for the import, returning the previous setting.
+
+        The journal stays in WAL mode, so a crash can lose the most recent
+        commits but cannot corrupt the database, and other open connections
+        (TUI, MCP server) don't block the switch.
+        """
+        previous = {'synchronous': str(query_one("PRAGMA synchronous")['synchronous'])}
+        execute("PRAGMA synchronous=OFF", commit=False)
+        return previous
+
+    def _exit_fast_mode(self, previous: Dict[str, str]):
+        """Restore the durability setting saved by _enter_fast_mode"""
+        execute(f"PRAGMA synchronous={previous['synchronous']}", commit=False)
+
     def import_files(self) -> ImportStats:
         """Scan and import project files"""
         print(f"\n{'='*80}")
@@ -92,34 +197,56 @@ class ProjectImporter:
             print("\n🏃 Dry run - no changes made")
             return self.stats
 
-        # Wrap entire import in transaction for atomicity
-        with transaction():
-            # Step 2: Import file metadata
-            print("\n💾 Importing file metadata...")
-            self._import_file_metadata(scanned_files)
-            print(f"   Imported {self.stats.files_imported} files")
-
-            # Step 3: Store file contents and create versions
-            print("\n📄 Storing file contents...")
-            self._store_file_contents()
-            print(f"   Stored {self.stats.content_stored} files")
-            print(f"   Created {self.stats.versions_created} versions")
-
-            # Step 4: Analyze SQL files
-            print("\n🔬 Analyzing SQL files...")
-            sql_files = [f for f in scanned_files if f.file_type in ('sql_file', 'sql_migration')]
-            self._analyze_sql_files(sql_files)
-            print(f"   Found {self.stats.sql_objects_found} SQL objects")
-
-            # Step 5: Analyze dependencies
-            print("\n🔗 Analyzing dependencies...")
-            self._analyze_dependencies(scanned_files)
-            print(f"   Found {self.stats.dependencies_found} dependencies")
-
-            # Step 6: Populate file metadata
-            print("\n📋 Populating file metadata...")
-            self._populate_file_metadata(scanned_files)
-            print(f"   Created {self.stats.metadata_entries} metadata entries")
+        # Hash every file and compare against the previous import
+        print("\n#️⃣  Hashing file contents...")
+        changed_files = self._detect_changed_files(scanned_files)
+        print(f"   {len(changed_files)} new or changed files")
+        self._refresh_commit_hashes(scanned_files)
+
+        if not changed_files:
+            print(f"\n{'='*80}")
+            print("✅ No changes since last import")
+            print(f"{'='*80}\n")
+            return self.stats
+
+        previous_pragmas = self._enter_fast_mode() if self.fast else None
+
+        try:
+            # Wrap entire import in transaction for atomicity
+            with transaction():
+                # Step 2: Import file metadata
+                print("\n💾 Importing file metadata...")
+                self._import_file_metadata(changed_files)
+                print(f"   Imported {self.stats.files_imported} files")
+
+                # Step 3: Store file contents and create versions
+                print("\n📄 Storing file contents...")
+                self._store_file_contents()
+                print(f"   Stored {self.stats.content_stored} files")
+                print(f"   Created {self.stats.versions_created} versions")
+
+                # Step 4: Analyze SQL files
+                print("\n🔬 Analyzing SQL files...")
+                sql_files = [f for f in changed_files if f.file_type in ('sql_file', 'sql_migration')]
+                self._analyze_sql_files(sql_files)
+                print(f"   Found {self.stats.sql_objects_found} SQL objects")
+
+                # Step 5: Analyze dependencies. New files can satisfy imports of
+                # unchanged ones, so they force a full pass.
+                print("\n🔗 Analyzing dependencies...")
+                if self.new_paths:
+                    self._analyze_dependencies(scanned_files)
+                else:
+                    self._analyze_dependencies(changed_files, only_changed=True)
+                print(f"   Found {self.stats.dependencies_found} dependencies")
+
+                # Step 6: Populate file metadata
+                print("\n📋 Populating file metadata...")
+                self._populate_file_metadata(changed_files)
+                print(f"   Created {self.stats.metadata_entries} metadata entries")
+        finally:
+            if previous_pragmas:
+                self._exit_fast_mode(previous_pragmas)
 
         # Transaction committed successfully
         print(f"\n{'='*80}")
@@ -128,10 +255,75 @@ class ProjectImporter:
 
         return self.stats
 
+    def _detect_changed_files(self, files: List[ScannedFile]) -> List[ScannedFile]:
+        """Return tracked files that are new or whose content hash changed"""
+        rows = query_all("""
+            SELECT pf.id, pf.file_path, pf.last_commit_hash, fc.content_hash
+            FROM project_files pf
+            LEFT JOIN file_contents fc ON fc.file_id = pf.id AND fc.is_current = 1
+            WHERE pf.project_id = ?
+        """, (self.project_id,))
+        self.previous_hashes = {row['file_path']: row['content_hash'] for row in rows}
+        self.previous_commits = {
+            row['file_path']: (row['id'], row['last_commit_hash']) for row in rows
+        }
+
+        tracked = [f for f in files if f.file_type in self.file_types]
+        self.stats.files_skipped += len(files) - len(tracked)
+
+        # Only hashes are kept; changed files are read again when stored
+        paths = [self.project_root / f.relative_path for f in tracked]
+        changed = []
+        for file, (_, file_content) in zip(tracked, self.content_store.read_many(paths)):
+            path = file.relative_path
+            if path not in self.previous_hashes:
+                self.new_paths.add(path)
+                changed.append(file)
+            elif file_content and self.content_store.content_changed(
+                self.previous_hashes[path], file_content.hash_sha256
+            ):
+                changed.append(file)
+
+            if file_content:
+                self.content_hashes[path] = file_content.hash_sha256
+
+        self.changed_paths = [f.relative_path for f in changed]
+        return changed
+
+    def _refresh_commit_hashes(self, files: List[ScannedFile]):
+        """Update last_commit_hash of unchanged files whose last commit moved.
+
+        Unchanged files are not re-imported, so a commit made since the last
+        import would otherwise leave their hash stale. Git info is prefetched
+        for every tracked file, so importing the changed ones reuses the same
+        `git log`.
+        """
+        tracked = [f for f in files if f.file_type in self.file_types]
+        self.git_analyzer.prefetch_all(Path(f.absolute_path) for f in tracked)
+
+        changed = set(self.changed_paths)
+        updates = []
+        for file in tracked:
+            previous = self.previous_commits.get(file.relative_path)
+            if previous is None or file.relative_path in changed:
+                continue
+            file_id, old_hash = previous
+            commit_hash = self.git_analyzer.get_file_info(Path(file.absolute_path)).commit_hash
+            if commit_hash != old_hash:
+                updates.append((commit_hash, file_id))
+
+        if updates:
+            executemany("UPDATE project_files SET last_commit_hash = ? WHERE id = ?", updates)
+
     def _import_file_metadata(self, files: List[ScannedFile]):
         """Import file metadata into project_files table"""
         records = []
 
+        # One `git log` for every file instead of several git calls per file
+        self.git_analyzer.prefetch_all(
+            Path(file.absolute_path) for file in files if file.file_type in self.file_types
+        )
+
         for file in files:
             # Skip if file type not recognized
             if file.file_type not in self.file_types:
@@ -152,200 +344,246 @@ class ProjectImporter:
                 'active'
             ))
 
-        # Batch insert (commit=False because we're in a transaction)
+        # Batch upsert (commit=False because we're in a transaction). Updating in
+        # place keeps file ids stable, so rows that reference them survive.
         if records:
             executemany("""
-                INSERT OR REPLACE INTO project_files
+                INSERT INTO project_files
                 (project_id, file_type_id, file_path, file_name, component_name,
                  lines_of_code, last_commit_hash, status)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(project_id, file_path) DO UPDATE SET
+                    file_type_id = excluded.file_type_id,
+                    file_name = excluded.file_name,
+                    component_name = excluded.component_name,
+                    lines_of_code = excluded.lines_of_code,
+                    last_commit_hash = excluded.last_commit_hash,
+                    status = excluded.status,
+                    updated_at = datetime('now')
             """, records, commit=False)
 
             self.stats.files_imported = len(records)
 
+        rows = query_all("""
+            SELECT id, file_path FROM project_files WHERE project_id = ?
+        """, (self.project_id,))
+        self.file_ids = {row['file_path']: row['id'] for row in rows}
+
     def _store_file_contents(self):
         """Store file contents and create versions"""
-        # Get all tracked files for this project
-        files = query_all("""
-            SELECT id, file_path
-            FROM project_files
-            WHERE project_id = ?
-        """, (self.project_id,))
+        # Only new or changed files need their contents stored
+        files = [
+            (self.file_ids[path], path)
+            for path in self.changed_paths if path in self.file_ids
+        ]
 
         # Get author info
         author_info = self.git_analyzer.author_info
         author = author_info['name']
 
-        for file in files:
-            file_path = self.project_root / file['file_path']
+        # Read and hash files concurrently; DB writes stay on this thread
+        file_paths = [self.project_root / path for _, path in files]
+        contents = self.content_store.read_many(file_paths)
 
-            if not file_path.exists():
-                self.stats.files_skipped += 1
-                continue
+        # Rows are buffered and written in batches (one prepared statement each)
+        blob_rows = []
+        content_rows = []
 
-            # Read content
-            file_content = self.content_store.read_file_content(file_path)
+        for (file_id, path), (_, file_content) in zip(files, contents):
             if not file_content:
                 self.stats.files_skipped += 1
                 continue
 
-            # Check if content changed
-            existing = query_one(
-                "SELECT content_hash FROM file_contents WHERE file_id = ?",
-                (file['id'],)
-            )
+            self.content_hashes[path] = file_content.hash_sha256
 
+            # Check if content changed
             if not self.content_store.content_changed(
-                existing['content_hash'] if existing else None,
+                self.previous_hashes.get(path),
                 file_content.hash_sha256
             ):
                 continue
 
-            # First, store content blob (content-addressable storage)
-            # Use INSERT OR IGNORE to avoid duplicates
-            if file_content.content_type == 'text':
-                execute("""
-                    INSERT OR IGNORE INTO content_blobs
-                    (hash_sha256, content_text, content_blob, content_type, encoding, file_size_bytes)
-                    VALUES (?, ?, NULL, ?, ?, ?)
-                """, (
-                    file_content.hash_sha256,
-                    file_content.content_text,
-                    file_content.content_type,
-                    file_content.encoding,
-                    file_content.file_size
-                ), commit=False)
-            else:
-                execute("""
-                    INSERT OR IGNORE INTO content_blobs
-                    (hash_sha256, content_text, content_blob, content_type, encoding, file_size_bytes)
-                    VALUES (?, NULL, ?, ?, ?, ?)
-                """, (
-                    file_content.hash_sha256,
-                    file_content.content_blob,
-                    file_content.content_type,
-                    file_content.encoding,
-                    file_content.file_size
-                ), commit=False)
-
-            # Then, reference the blob in file_contents
-            execute("""
-                INSERT OR REPLACE INTO file_contents
-                (file_id, content_hash, file_size_bytes, line_count, is_current)
-                VALUES (?, ?, ?, ?, 1)
-            """, (
-                file['id'],
+            # Content blob (content-addressable storage) plus its file_contents
+            # reference; text goes in content_text, everything else in content_blob
+            is_text = file_content.content_type == 'text'
+            blob_rows.append((
+                file_content.hash_sha256,
+                file_content.content_text if is_text else None,
+                None if is_text else file_content.content_blob,
+                file_content.content_type,
+                file_content.encoding,
+                file_content.file_size
+            ))
+            content_rows.append((
+                file_id,
                 file_content.hash_sha256,
                 file_content.file_size,
                 file_content.line_count
-            ), commit=False)
+            ))
 
             self.stats.content_stored += 1
 
             # Note: Versions are now managed by VCS system (vcs_commits + vcs_file_states)
             # Not creating file_versions entries during import - they'll be created on commit
 
+            if len(content_rows) >= STORE_BATCH_SIZE:
+                self._flush_contents(blob_rows, content_rows)
+
+        self._flush_contents(blob_rows, content_rows)
+
+    def _flush_contents(self, blob_rows: List[tuple], content_rows: List[tuple]):
+        """Write buffered content rows with one statement each, then clear the buffers"""
+        if not content_rows:
+            return
+
+        # Blobs first: file_contents.content_hash references content_blobs.
+        # Use INSERT OR IGNORE to avoid duplicates
+        executemany("""
+            INSERT OR IGNORE INTO content_blobs
+            (hash_sha256, content_text, content_blob, content_type, encoding, file_size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, blob_rows, commit=False)
+
+        executemany("""
+            INSERT OR REPLACE INTO file_contents
+            (file_id, content_hash, file_size_bytes, line_count, is_current)
+            VALUES (?, ?, ?, ?, 1)
+        """, content_rows, commit=False)
+
+        blob_rows.clear()
+        content_rows.clear()
+
     def _analyze_sql_files(self, sql_files: List[ScannedFile]):
         """Analyze SQL files and extract database objects (stored for metadata)"""
         # Store SQL objects in memory for use in _populate_file_metadata
         self.sql_objects_by_file = {}
 
-        for sql_file in sql_files:
-            file_path = self.project_root / sql_file.relative_path
+        # Reuse analysis of unchanged content from earlier imports
+        cache_enabled = query_one(
+            "SELECT 1 FROM pragma_table_info('sql_analysis_cache') WHERE name = 'analyzer_version'"
+        ) is not None
+        hashes = {f.relative_path: self.content_hashes.get(f.relative_path) for f in sql_files}
+        cached = self._load_sql_analysis_cache(set(hashes.values()) - {None}) if cache_enabled else {}
 
-            if not file_path.exists():
+        for sql_file in sql_files:
+            sql_objects = cached.get(hashes[sql_file.relative_path])
+            if sql_objects:
+                self.sql_objects_by_file[sql_file.relative_path] = sql_objects
+                self.stats.sql_objects_found += len(sql_objects)
+
+        misses = [f for f in sql_files if hashes[f.relative_path] not in cached]
+        paths = [self.project_root / sql_file.relative_path for sql_file in misses]
+        results = _map_batched(_analyze_sql_batch, paths)
+        new_entries = {}
+
+        for sql_file, (sql_objects, error) in zip(misses, results):
+            if error:
+                print(f"   Warning: Failed to analyze {sql_file.relative_path}: {error}")
                 continue
 
-            try:
-                # Analyze SQL file
-                sql_objects = SqlAnalyzer.analyze_sql_file(file_path)
-
-                if sql_objects:
-                    self.sql_objects_by_file[sql_file.relative_path] = sql_objects
-                    self.stats.sql_objects_found += len(sql_objects)
-
-            except Exception as e:
-                print(f"   Warning: Failed to analyze {sql_file.relative_path}: {e}")
-                continue
+            content_hash = hashes[sql_file.relative_path]
+            if cache_enabled and content_hash and sql_objects is not None:
+                new_entries[content_hash] = _dumps([asdict(obj) for obj in sql_objects])
 
-    def _analyze_dependencies(self, files: List[ScannedFile]):
-        """Analyze file dependencies and populate file_dependencies table"""
-        # Get all file IDs for this project for cleanup
-        file_ids = query_all("""
-            SELECT id FROM project_files WHERE project_id = ?
-        """, (self.project_id,))
+            if sql_objects:
+                self.sql_objects_by_file[sql_file.relative_path] = sql_objects
+                self.stats.sql_objects_found += len(sql_objects)
 
-        if file_ids:
-            # Clear existing dependencies for these files
-            file_id_list = ','.join(str(f['id']) for f in file_ids)
-            execute(f"""
+        if new_entries:
+            version = SqlAnalyzer.CACHE_VERSION
+            # Analyses from other analyzer versions can never be served again
+            execute("DELETE FROM sql_analysis_cache WHERE analyzer_version != ?",
+                    (version,), commit=False)
+            executemany("""
+                INSERT OR IGNORE INTO sql_analysis_cache (content_hash, analyzer_version, objects_json)
+                VALUES (?, ?, ?)
+            """, [(content_hash, version, objects_json)
+                  for content_hash, objects_json in new_entries.items()], commit=False)
+
+    def _load_sql_analysis_cache(self, content_hashes: set) -> Dict[str, List[SqlObject]]:
+        """Load cached results of the current SqlAnalyzer for the given content hashes"""
+        cached = {}
+        hashes = list(content_hashes)
+        for start in range(0, len(hashes), CACHE_LOOKUP_CHUNK):
+            chunk = hashes[start:start + CACHE_LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = query_all(f"""
+                SELECT content_hash, objects_json FROM sql_analysis_cache
+                WHERE analyzer_version = ? AND content_hash IN ({placeholders})
+            """, (SqlAnalyzer.CACHE_VERSION, *chunk))
+            for row in rows:
+                cached[row['content_hash']] = [
+                    SqlObject(**fields) for fields in json.loads(row['objects_json'])
+                ]
+        return cached
+
+    def _analyze_dependencies(self, files: List[ScannedFile], only_changed: bool = False):
+        """Analyze file dependencies and populate file_dependencies table
+
+        With only_changed, just the given files' outgoing dependencies are
+        rebuilt; rows pointing at them stay valid because file ids are stable.
+        """
+        if only_changed:
+            # Clear existing dependencies of the given files only
+            executemany("""
+                DELETE FROM file_dependencies WHERE parent_file_id = ?
+            """, [
+                (self.file_ids[f.relative_path],)
+                for f in files if f.relative_path in self.file_ids
+            ], commit=False)
+        else:
+            # Clear existing dependencies for this project's files
+            execute("""
                 DELETE FROM file_dependencies
-                WHERE parent_file_id IN ({file_id_list})
-            """, commit=False)
+                WHERE parent_file_id IN (
+                    SELECT id FROM project_files WHERE project_id = ?
+                )
+            """, (self.project_id,), commit=False)
 
         # Build file path to ID mapping for faster lookups
         file_map = {}
-        all_project_files = query_all("""
-            SELECT id, file_path FROM project_files WHERE project_id = ?
-        """, (self.project_id,))
-
-        for f in all_project_files:
-            file_map[f['file_path']] = f['id']
+        for file_path, file_id in self.file_ids.items():
+            file_map[file_path] = file_id
             # Also add without extension for module lookups
-            base = Path(f['file_path']).stem
+            base = Path(file_path).stem
             if base not in file_map:
-                file_map[base] = f['id']
+                file_map[base] = file_id
 
-        all_dependencies = []
+        # Also key files by their extension-less path so an import resolves with a
+        # single lookup (exact paths and stems still win over these)
+        for ext in _EXT_PROBE:
+            for file_path, file_id in self.file_ids.items():
+                if file_path.endswith(ext):
+                    file_map.setdefault(file_path[:-len(ext)], file_id)
+
+        # Deduplicate on (parent, dependency, type) as we go; first occurrence wins
+        seen_deps = {}
 
         # Only analyze Python and JS files (skip SQL for now as it's slow)
         relevant_types = {'python', 'javascript', 'typescript', 'jsx_component', 'tsx_component'}
 
-        for scanned_file in files:
-            if scanned_file.file_type not in relevant_types:
-                continue
-
-            file_path = self.project_root / scanned_file.relative_path
+        # Only files we can attribute to a project_files row
+        candidates = [
+            f for f in files
+            if f.file_type in relevant_types and file_map.get(f.relative_path)
+        ]
+        work = [(self.project_root / f.relative_path, f.file_type) for f in candidates]
+        results = _map_batched(_analyze_dependency_batch, work)
 
-            if not file_path.exists():
-                continue
+        for scanned_file, dependencies in zip(candidates, results):
+            file_id = file_map[scanned_file.relative_path]
 
-            # Get file_id from map
-            file_id = file_map.get(scanned_file.relative_path)
-            if not file_id:
+            # Unreadable file
+            if dependencies is None:
                 continue
 
-            # Read content
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                continue
-
-            # Analyze dependencies
-            dependencies = DependencyAnalyzer.analyze_file(
-                file_path,
-                content,
-                scanned_file.file_type
-            )
-
             for dep in dependencies:
                 # Skip external dependencies
                 if dep.is_external:
                     continue
 
                 # Try to find target file in project using map
-                target_file_id = None
-
-                # Try exact match first
-                if dep.imported_module in file_map:
-                    target_file_id = file_map[dep.imported_module]
-                else:
-                    # Try with extensions
-                    for ext in ['.py', '.js', '.ts', '.tsx', '.jsx']:
-                        potential_path = dep.imported_module + ext
-                        if potential_path in file_map:
-                            target_file_id = file_map[potential_path]
-                            break
+                target_file_id = file_map.get(dep.imported_module)
 
                 # Only add if we found a target file (internal dependencies)
                 if target_file_id:
@@ -353,7 +591,7 @@ class ProjectImporter:
                     is_hard = 1  # Internal dependencies are hard dependencies
                     usage_context = f"module: {dep.imported_module}"
 
-                    all_dependencies.append((
+                    seen_deps.setdefault((file_id, target_file_id, dependency_type), (
                         file_id,
                         target_file_id,
                         dependency_type,
@@ -361,50 +599,29 @@ class ProjectImporter:
                         usage_context
                     ))
 
-        # Batch insert dependencies (deduplicate first)
-        if all_dependencies:
-            # Deduplicate based on (parent, dependency, type)
-            seen = set()
-            unique_deps = []
-            for dep in all_dependencies:
-                key = (dep[0], dep[1], dep[2])  # parent_file_id, dependency_file_id, dependency_type
-                if key not in seen:
-                    seen.add(key)
-                    unique_deps.append(dep)
-
-            if unique_deps:
-                executemany("""
-                    INSERT INTO file_dependencies
-                    (parent_file_id, dependency_file_id, dependency_type,
-                     is_hard_dependency, usage_context)
-                    VALUES (?, ?, ?, ?, ?)
-                """, unique_deps, commit=False)
-
-                self.stats.dependencies_found = len(unique_deps)
+        # Batch insert dependencies
+        if seen_deps:
+            executemany("""
+                INSERT INTO file_dependencies
+                (parent_file_id, dependency_file_id, dependency_type,
+                 is_hard_dependency, usage_context)
+                VALUES (?, ?, ?, ?, ?)
+            """, list(seen_deps.values()), commit=False)
+
+            self.stats.dependencies_found = len(seen_deps)
 
     def _populate_file_metadata(self, files: List[ScannedFile]):
         """Populate file_metadata table with structured metadata"""
-        # Clear existing metadata
-        execute("""
-            DELETE FROM file_metadata
-            WHERE file_id IN (
-                SELECT id FROM project_files WHERE project_id = ?
-            )
-        """, (self.project_id,), commit=False)
+        # Clear existing metadata of the files being rewritten
+        files = [f for f in files if f.relative_path in self.file_ids]
+        executemany("""
+            DELETE FROM file_metadata WHERE file_id = ?
+        """, [(self.file_ids[f.relative_path],) for f in files], commit=False)
 
         metadata_records = []
 
         for scanned_file in files:
-            # Get file_id
-            file_record = query_one("""
-                SELECT id FROM project_files
-                WHERE project_id = ? AND file_path = ?
-            """, (self.project_id, scanned_file.relative_path))
-
-            if not file_record:
-                continue
-
-            file_id = file_record['id']
+            file_id = self.file_ids[scanned_file.relative_path]
 
             # Determine metadata type based on file type
             metadata_type = None
@@ -418,15 +635,15 @@ class ProjectImporter:
                     metadata_type = 'sql_object'
                     metadata_json = {
                         'object_count': len(sql_objects),
-                        'object_types': list(set(obj.object_type for obj in sql_objects)),
+                        'object_types': list({obj.object_type for obj in sql_objects}),
                         'objects': [
-                            {
-                                'type': obj.object_type,
-                                'name': obj.object_name,
-                                'schema': obj.schema_name,
-                                'has_rls': obj.has_rls_enabled,
-                                'has_foreign_keys': obj.has_foreign_keys
-                            }
+                            dict(zip(_SQL_OBJ_KEYS, (
+                                obj.object_type,
+                                obj.object_name,
+                                obj.schema_name,
+                                obj.has_rls_enabled,
+                                obj.has_foreign_keys
+                            )))
                             for obj in sql_objects
                         ]
                     }
@@ -453,12 +670,11 @@ class ProjectImporter:
                 }
 
             if metadata_type:
-                import json
                 metadata_records.append((
                     file_id,
                     metadata_type,
                     scanned_file.component_name or scanned_file.file_name,
-                    json.dumps(metadata_json)
+                    _dumps(metadata_json)
                 ))
 
         # Batch insert metadata
@@ -480,11 +696,14 @@ def main():
     parser.add_argument('project_root', help='Project root directory')
     parser.add_argument('project_slug', help='Project slug')
     parser.add_argument('--dry-run', action='store_true', help='Dry run (no changes)')
+    parser.add_argument('--fast', action='store_true',
+                        help='Disable fsync during import (faster; a crash may lose recent commits)')
 
     args = parser.parse_args()
 
     try:
-        importer = ProjectImporter(args.project_slug, args.project_root, args.dry_run)
+        importer = ProjectImporter(args.project_slug, args.project_root, args.dry_run,
+                                   fast=args.fast)
         stats = importer.import_files()
 
         print("\n📈 Import Statistics:")
@@ -563,6 +782,42 @@ class WorkingStateDetector:
                 file_content.file_size,
             ), commit=False)
 
+    @staticmethod
+    def _read_large_file(file_path: Path):
+        """Read a file too large for read_file_content via store_content"""
+        blob_meta = ContentStore().store_content(file_path)
+        if not blob_meta:
+            return None
+
+        # Create a FileContent-like object from BlobMetadata
+        return type('FC', (), {
+            'hash_sha256': blob_meta.content_hash,
+            'content_type': blob_meta.content_type,
+            'content_text': blob_meta.content_text,
+            'content_blob': blob_meta.content_blob,
+            'encoding': blob_meta.encoding,
+            'file_size': blob_meta.file_size,
+            'line_count': blob_meta.line_count,
+        })()
+
+    def _load_stat_cache(self) -> Optional[Dict[int, Tuple[int, int, str]]]:
+        """Load (size, mtime_ns, hash) per file id, or None if the table is missing"""
+        if query_one(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_stat_cache'"
+        ) is None:
+            return None
+
+        rows = query_all("""
+            SELECT sc.file_id, sc.size_bytes, sc.mtime_ns, sc.content_hash
+            FROM file_stat_cache sc
+            JOIN project_files pf ON pf.id = sc.file_id
+            WHERE pf.project_id = ?
+        """, (self.project_id,))
+        return {
+            row['file_id']: (row['size_bytes'], row['mtime_ns'], row['content_hash'])
+            for row in rows
+        }
+
     def detect_changes(self) -> Dict[str, int]:
         """Detect file changes and update vcs_working_state table"""
         print(f"\n🔍 Detecting changes in {self.project_slug}...")
@@ -583,15 +838,31 @@ class WorkingStateDetector:
         scanner = FileScanner(self.project_root)
         current_files = scanner.scan_directory()
 
-        # Get all tracked files from database
+        # Get all tracked files with their last *committed* content hash in one
+        # query. file_contents is updated by project sync, so comparing against
+        # it always shows "unmodified"; the CLI commit stores per-file state in
+        # vcs_file_states.
         tracked_files = query_all("""
-            SELECT id, file_path FROM project_files
-            WHERE project_id = ?
+            SELECT pf.id, pf.file_path, (
+                SELECT vfs.content_hash
+                FROM vcs_file_states vfs
+                JOIN vcs_commits vc ON vc.id = vfs.commit_id
+                WHERE vfs.file_id = pf.id AND vfs.change_type != 'deleted'
+                ORDER BY vc.commit_timestamp DESC
+                LIMIT 1
+            ) AS committed_hash
+            FROM project_files pf
+            WHERE pf.project_id = ?
         """, (self.project_id,))
 
         # Create lookup maps
         tracked_by_path = {f['file_path']: f['id'] for f in tracked_files}
+        committed_hashes = {f['id']: f['committed_hash'] for f in tracked_files}
         current_by_path = {f.relative_path: f for f in current_files}
+        file_type_ids = {
+            row['type_name']: row['id']
+            for row in query_all("SELECT id, type_name FROM file_types")
+        }
 
         changes = {
             'added': 0,
@@ -608,114 +879,69 @@ class WorkingStateDetector:
 
         records = []
 
-        # Check for added and modified files
+        # A tracked file whose size and mtime match the stat cache still has the
+        # cached hash; if that is the committed hash it is unmodified unread
+        stat_cache = self._load_stat_cache()
+        racy_after = time.time_ns() - STAT_RACY_WINDOW_NS
+        stat_updates = []
+        file_stats = {}
+        pending = []
+
         for rel_path, scanned_file in current_by_path.items():
-            if rel_path not in tracked_by_path:
-                # New file - create project_files entry first
+            try:
+                st = os.stat(self.project_root / rel_path)
+            except OSError:
+                st = None
+            file_stats[rel_path] = st
+
+            file_id = tracked_by_path.get(rel_path)
+            cached = stat_cache.get(file_id) if stat_cache is not None else None
+            if (st and cached and cached == (st.st_size, st.st_mtime_ns, committed_hashes[file_id])):
+                changes['unmodified'] += 1
+                records.append((self.project_id, branch_id, file_id, 'unmodified', 0, cached[2]))
+            else:
+                pending.append((rel_path, scanned_file))
 
-                # Read file content
-                file_path = self.project_root / rel_path
-                file_content = ContentStore.read_file_content(file_path)
+        # Read and hash the remaining files concurrently
+        paths = [self.project_root / rel_path for rel_path, _ in pending]
+        contents = ContentStore.read_many(paths)
 
+        # Check for added and modified files
+        for (rel_path, scanned_file), (file_path, file_content) in zip(pending, contents):
+            if not file_content:
+                # Files above BLOB_INLINE_THRESHOLD go through store_content
+                file_content = self._read_large_file(file_path)
                 if not file_content:
-                    # Try store_content for larger files (read_file_content
-                    # skips files above BLOB_INLINE_THRESHOLD)
-                    store = ContentStore()
-                    blob_meta = store.store_content(file_path)
-                    if blob_meta:
-                        # Create a FileContent-like object from BlobMetadata
-                        file_content = type('FC', (), {
-                            'hash_sha256': blob_meta.content_hash,
-                            'content_type': blob_meta.content_type,
-                            'content_text': blob_meta.content_text,
-                            'content_blob': blob_meta.content_blob,
-                            'encoding': blob_meta.encoding,
-                            'file_size': blob_meta.file_size,
-                            'line_count': blob_meta.line_count,
-                        })()
-                    else:
-                        continue
-
-                # Use the file_type already detected by the scanner (full mapping)
-                file_type_name = scanned_file.file_type
-                file_type_row = query_one(
-                    "SELECT id FROM file_types WHERE type_name = ?", (file_type_name,)
-                )
-                if not file_type_row:
                     continue
-                file_type_id = file_type_row['id']
+
+            if rel_path not in tracked_by_path:
+                # New file - create project_files entry first, using the
+                # file_type already detected by the scanner (full mapping)
+                file_type_id = file_type_ids.get(scanned_file.file_type)
+                if not file_type_id:
+                    continue
 
                 # Extract file name
                 file_name = Path(rel_path).name
 
                 # Create project_files entry
-                execute("""
+                file_id = execute("""
                     INSERT INTO project_files (project_id, file_type_id, file_path, file_name)
                     VALUES (?, ?, ?, ?)
                 """, (self.project_id, file_type_id, rel_path, file_name), commit=False)
 
-                # Get the new file_id
-                new_file = query_one("""
-                    SELECT id FROM project_files
-                    WHERE project_id = ? AND file_path = ?
-                """, (self.project_id, rel_path))
-
-                if new_file:
-                    file_id = new_file['id']
-                    tracked_by_path[rel_path] = file_id
-                    state = 'added'
-                    changes['added'] += 1
+                tracked_by_path[rel_path] = file_id
+                state = 'added'
+                changes['added'] += 1
 
-                    # Ensure content_blobs entry exists (required by file_contents FK)
-                    self._ensure_content_blob(file_content)
-
-                    records.append((
-                        self.project_id,
-                        branch_id,
-                        file_id,
-                        state,
-                        0,  # staged
-                        file_content.hash_sha256
-                    ))
+                # Ensure content_blobs entry exists (required by file_contents FK)
+                self._ensure_content_blob(file_content)
             else:
                 # Check if modified
                 file_id = tracked_by_path[rel_path]
+                last_committed = committed_hashes[file_id]
 
-                # Get last *committed* content hash (not just stored/imported content)
-                # file_contents is updated by project sync, so comparing against it
-                # always shows "unmodified". We need the last VCS commit hash.
-                # The CLI commit stores per-file state in vcs_file_states.
-                last_committed = query_one("""
-                    SELECT vfs.content_hash
-                    FROM vcs_file_states vfs
-                    JOIN vcs_commits vc ON vc.id = vfs.commit_id
-                    WHERE vfs.file_id = ? AND vfs.change_type != 'deleted'
-                    ORDER BY vc.commit_timestamp DESC
-                    LIMIT 1
-                """, (file_id,))
-
-                # Read current content hash
-                file_path = self.project_root / rel_path
-                file_content = ContentStore.read_file_content(file_path)
-
-                if not file_content:
-                    # Try store_content for larger files
-                    store = ContentStore()
-                    blob_meta = store.store_content(file_path)
-                    if blob_meta:
-                        file_content = type('FC', (), {
-                            'hash_sha256': blob_meta.content_hash,
-                            'content_type': blob_meta.content_type,
-                            'content_text': blob_meta.content_text,
-                            'content_blob': blob_meta.content_blob,
-                            'encoding': blob_meta.encoding,
-                            'file_size': blob_meta.file_size,
-                            'line_count': blob_meta.line_count,
-                        })()
-                    else:
-                        continue
-
-                if last_committed and last_committed['content_hash'] == file_content.hash_sha256:
+                if last_committed == file_content.hash_sha256:
                     state = 'unmodified'
                     changes['unmodified'] += 1
                 elif not last_committed:
@@ -728,14 +954,20 @@ class WorkingStateDetector:
                     changes['modified'] += 1
                     self._ensure_content_blob(file_content)
 
-                records.append((
-                    self.project_id,
-                    branch_id,
-                    file_id,
-                    state,
-                    0,  # staged
-                    file_content.hash_sha256
-                ))
+            records.append((
+                self.project_id,
+                branch_id,
+                file_id,
+                state,
+                0,  # staged
+                file_content.hash_sha256
+            ))
+
+            # Remember the hash for this stat unless the file may still be
+            # changing within mtime granularity
+            st = file_stats[rel_path]
+            if stat_cache is not None and st and st.st_mtime_ns < racy_after:
+                stat_updates.append((file_id, st.st_size, st.st_mtime_ns, file_content.hash_sha256))
 
         # Check for deleted files
         for file_path, file_id in tracked_by_path.items():
@@ -752,6 +984,13 @@ class WorkingStateDetector:
                     None  # No hash for deleted files
                 ))
 
+        if stat_updates:
+            executemany("""
+                INSERT OR REPLACE INTO file_stat_cache
+                (file_id, size_bytes, mtime_ns, content_hash)
+                VALUES (?, ?, ?, ?)
+            """, stat_updates, commit=False)
+
         # Insert working state
         if records:
             executemany("""
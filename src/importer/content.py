@@ -4,10 +4,12 @@ File content storage with versioning and hashing
 Supports both inline (database) and external (filesystem) storage
 """
 import hashlib
+import mmap
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Set, Tuple
+from typing import Iterator, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 # Import config
@@ -43,8 +45,15 @@ BINARY_EXTENSIONS = {
 
 MAX_FILE_SIZE = config.BLOB_MAX_SIZE  # Configurable max size
 
+# Files read concurrently per batch by read_many (bounds memory held in flight)
+READ_BATCH_SIZE = 256
 
-@dataclass
+# Files at least this large are mapped instead of read, so hashing and decoding
+# work on the page cache without an intermediate bytes copy
+MMAP_THRESHOLD = 1024 * 1024
+
+
+@dataclass(slots=True)
 class FileContent:
     """Represents file content with metadata (inline storage)"""
     content_type: str  # 'text' or 'binary'
@@ -99,7 +108,7 @@ class ContentStore:
         return file_path.suffix.lower() in BINARY_EXTENSIONS
 
     @staticmethod
-    def calculate_hash(content: bytes) -> str:
+    def calculate_hash(content) -> str:
         """Calculate SHA-256 hash of content"""
         return hashlib.sha256(content).hexdigest()
 
@@ -108,6 +117,10 @@ class ContentStore:
         """Calculate SHA-256 hash of file using streaming (for large files)"""
         hasher = hashlib.sha256()
         with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher.update(mm)
+                return hasher.hexdigest()
             while chunk := f.read(8192):
                 hasher.update(chunk)
         return hasher.hexdigest()
@@ -385,52 +398,80 @@ class ContentStore:
 
         DEPRECATED: Use store_content() instead for new code
         """
-        # Check file size
-        file_size = file_path.stat().st_size
-        if file_size > config.BLOB_INLINE_THRESHOLD:
-            # File too large for inline storage
-            return None
+        # One open() + fstat() instead of stat() followed by read_*() (readall()
+        # sizes its buffer from the same fstat)
+        with open(file_path, 'rb') as fp:
+            file_size = os.fstat(fp.fileno()).st_size
+            if file_size > config.BLOB_INLINE_THRESHOLD:
+                # File too large for inline storage
+                return None
+            if file_size >= MMAP_THRESHOLD:
+                with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return ContentStore._content_from_buffer(file_path, mm)
+            content_bytes = fp.read()
 
-        is_binary = ContentStore.is_binary_file(file_path)
-
-        if is_binary:
-            # Read as binary
-            content_bytes = file_path.read_bytes()
-            return FileContent(
-                content_type='binary',
-                content_blob=content_bytes,
-                encoding=None,
-                file_size=len(content_bytes),
-                line_count=None,
-                hash_sha256=ContentStore.calculate_hash(content_bytes)
-            )
-        else:
-            # Try to read as text
+        return ContentStore._content_from_buffer(file_path, content_bytes)
+
+    @staticmethod
+    def _content_from_buffer(file_path: Path, data) -> FileContent:
+        """Build a FileContent from file bytes or a read-only mmap of them"""
+        if not ContentStore.is_binary_file(file_path):
+            # Try to decode as text
             try:
-                content_text = file_path.read_text(encoding='utf-8')
-                content_bytes = content_text.encode('utf-8')
+                content_text = str(data, 'utf-8')
+            except UnicodeDecodeError:
+                # If UTF-8 fails, treat as binary
+                pass
+            else:
+                # Universal newlines, matching Path.read_text()
+                if '\r' in content_text:
+                    content_text = content_text.replace('\r\n', '\n').replace('\r', '\n')
+                    data = content_text.encode('utf-8')
                 line_count = len(content_text.splitlines())
 
                 return FileContent(
                     content_type='text',
                     content_text=content_text,
                     encoding='utf-8',
-                    file_size=len(content_bytes),
+                    file_size=len(data),
                     line_count=line_count,
-                    hash_sha256=ContentStore.calculate_hash(content_bytes)
-                )
-            except UnicodeDecodeError:
-                # If UTF-8 fails, treat as binary
-                content_bytes = file_path.read_bytes()
-                return FileContent(
-                    content_type='binary',
-                    content_blob=content_bytes,
-                    encoding=None,
-                    file_size=len(content_bytes),
-                    line_count=None,
-                    hash_sha256=ContentStore.calculate_hash(content_bytes)
+                    hash_sha256=ContentStore.calculate_hash(data)
                 )
 
+        # The blob must outlive a mapping; bytes(data) is a no-op for bytes
+        content_bytes = bytes(data)
+        return FileContent(
+            content_type='binary',
+            content_blob=content_bytes,
+            encoding=None,
+            file_size=len(content_bytes),
+            line_count=None,
+            hash_sha256=ContentStore.calculate_hash(content_bytes)
+        )
+
+    @staticmethod
+    def read_many(file_paths: List[Path],
+                  max_workers: Optional[int] = None) -> Iterator[Tuple[Path, Optional[FileContent]]]:
+        """
+        Read and hash many files concurrently (inline only)
+
+        Yields (path, FileContent) pairs in input order. Reads are issued from a
+        thread pool in batches of READ_BATCH_SIZE so the kernel can overlap
+        them, and hashing runs in the same workers (hashlib releases the GIL).
+        Missing files yield None, like files too large for inline storage.
+        """
+        def read_one(file_path: Path) -> Optional[FileContent]:
+            try:
+                return ContentStore.read_file_content(file_path)
+            except FileNotFoundError:
+                return None
+
+        workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(file_paths), READ_BATCH_SIZE):
+                batch = file_paths[start:start + READ_BATCH_SIZE]
+                yield from zip(batch, pool.map(read_one, batch))
+
     @staticmethod
     def content_changed(hash1: Optional[str], hash2: str) -> bool:
         """Check if content has changed by comparing hashes"""
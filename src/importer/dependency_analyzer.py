@@ -3,12 +3,13 @@
 Dependency analyzer - Extracts file dependencies from source code
 """
 import re
+from collections import defaultdict
 from pathlib import Path
 from typing import List, Set, Dict, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Dependency:
     """Represents a dependency between files"""
     source_file: str
@@ -21,34 +22,33 @@ class Dependency:
 class DependencyAnalyzer:
     """Analyzes source files to extract dependencies"""
 
-    # Python import patterns
-    PYTHON_PATTERNS = [
-        # import module / import module as alias
-        (r'^\s*import\s+([\w.]+)(?:\s+as\s+\w+)?', 'import', False),
-        # from module import ...
-        (r'^\s*from\s+([\w.]+)\s+import\s+', 'from_import', False),
-        # Relative imports: from . import / from .. import
-        (r'^\s*from\s+(\.+[\w.]*)\s+import\s+', 'from_import', True),
-    ]
+    # Python imports, one pass over the whole file: `import module [as alias]`
+    # or `from module import ...` (relative when the module starts with '.').
+    # [^\S\n] is whitespace that stays on the line.
+    PYTHON_IMPORT_RE = re.compile(
+        r'^[^\S\n]*(?:import[^\S\n]+(?P<module>[\w.]+)'
+        r'|from[^\S\n]+(?P<from_module>[\w.]+)[^\S\n]+import[^\S\n])',
+        re.MULTILINE
+    )
 
     # JavaScript/TypeScript patterns
     JS_PATTERNS = [
         # import ... from 'module'
-        (r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]', 'import', False),
+        (re.compile(r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]', re.MULTILINE), 'import', False),
         # import 'module'
-        (r'import\s+[\'"]([^\'"]+)[\'"]', 'import', False),
+        (re.compile(r'import\s+[\'"]([^\'"]+)[\'"]', re.MULTILINE), 'import', False),
         # require('module')
-        (r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)', 'require', False),
+        (re.compile(r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)', re.MULTILINE), 'require', False),
         # export ... from 'module'
-        (r'export\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]', 'export', False),
+        (re.compile(r'export\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]', re.MULTILINE), 'export', False),
     ]
 
     # SQL patterns
     SQL_PATTERNS = [
         # Foreign key references
-        (r'REFERENCES\s+([\w.]+)\s*\(', 'foreign_key', False),
+        (re.compile(r'REFERENCES\s+([\w.]+)\s*\(', re.IGNORECASE | re.MULTILINE), 'foreign_key', False),
         # View dependencies: FROM/JOIN table
-        (r'(?:FROM|JOIN)\s+([\w.]+)', 'table_reference', False),
+        (re.compile(r'(?:FROM|JOIN)\s+([\w.]+)', re.IGNORECASE | re.MULTILINE), 'table_reference', False),
     ]
 
     @staticmethod
@@ -63,20 +63,22 @@ class DependencyAnalyzer:
         dependencies = []
         rel_path = str(file_path)
 
-        for line in content.splitlines():
-            for pattern, import_type, is_relative in DependencyAnalyzer.PYTHON_PATTERNS:
-                matches = re.finditer(pattern, line)
-                for match in matches:
-                    module = match.group(1)
-                    is_external = DependencyAnalyzer.is_external_module(module)
-
-                    dependencies.append(Dependency(
-                        source_file=rel_path,
-                        imported_module=module,
-                        import_type=import_type,
-                        is_relative=is_relative,
-                        is_external=is_external
-                    ))
+        for match in DependencyAnalyzer.PYTHON_IMPORT_RE.finditer(content):
+            module = match.group('module')
+            if module is not None:
+                import_type, is_relative = 'import', False
+            else:
+                module = match.group('from_module')
+                import_type, is_relative = 'from_import', module.startswith('.')
+
+            dependencies.append(Dependency(
+                source_file=rel_path,
+                imported_module=module,
+                import_type=import_type,
+                is_relative=is_relative,
+                # Inlined is_external_module(); this runs for every import
+                is_external=module[:1] not in ('.', '/')
+            ))
 
         return dependencies
 
@@ -87,10 +89,10 @@ class DependencyAnalyzer:
         rel_path = str(file_path)
 
         for pattern, import_type, _ in DependencyAnalyzer.JS_PATTERNS:
-            matches = re.finditer(pattern, content, re.MULTILINE)
+            matches = pattern.finditer(content)
             for match in matches:
                 module = match.group(1)
-                is_relative = module.startswith('.') or module.startswith('/')
+                is_relative = module[:1] in ('.', '/')
                 is_external = not is_relative
 
                 dependencies.append(Dependency(
@@ -110,7 +112,7 @@ class DependencyAnalyzer:
         rel_path = str(file_path)
 
         for pattern, import_type, _ in DependencyAnalyzer.SQL_PATTERNS:
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
+            matches = pattern.finditer(content)
             for match in matches:
                 table = match.group(1)
 
@@ -139,39 +141,62 @@ class DependencyAnalyzer:
     @staticmethod
     def get_dependency_graph(dependencies: List[Dependency]) -> Dict[str, Set[str]]:
         """Build dependency graph from dependencies"""
-        graph = {}
+        graph = defaultdict(set)
         for dep in dependencies:
-            if dep.source_file not in graph:
-                graph[dep.source_file] = set()
             graph[dep.source_file].add(dep.imported_module)
-        return graph
+        return dict(graph)
 
     @staticmethod
     def find_circular_dependencies(graph: Dict[str, Set[str]]) -> List[List[str]]:
-        """Find circular dependencies in graph"""
-        def dfs(node: str, path: List[str], visited: Set[str]) -> List[List[str]]:
-            if node in path:
-                # Found cycle
-                cycle_start = path.index(node)
-                return [path[cycle_start:] + [node]]
-
-            if node in visited:
-                return []
-
-            visited.add(node)
-            cycles = []
-
-            if node in graph:
-                for neighbor in graph[node]:
-                    cycles.extend(dfs(neighbor, path + [node], visited))
-
-            return cycles
-
-        all_cycles = []
-        visited = set()
-
-        for node in graph:
-            cycles = dfs(node, [], visited)
-            all_cycles.extend(cycles)
-
-        return all_cycles
+        """Find circular dependencies in graph
+
+        Iterative Tarjan SCC, O(V+E) and free of recursion limits. Each strongly
+        connected component with more than one node (or a self-import) is
+        returned in DFS order, closed with its first node: [a, b, c, a].
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        cycles = []
+
+        for root in graph:
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+
+            while work:
+                node, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        index[neighbor] = lowlink[neighbor] = len(index)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(graph.get(neighbor, ()))))
+                        break
+                    if neighbor in on_stack and index[neighbor] < lowlink[node]:
+                        lowlink[node] = index[neighbor]
+                else:
+                    # All neighbors done: propagate lowlink, emit SCC at its root
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+
+                    if lowlink[node] == index[node]:
+                        start = len(stack) - 1
+                        while stack[start] != node:
+                            start -= 1
+                        component = stack[start:]
+                        del stack[start:]
+                        on_stack.difference_update(component)
+
+                        if len(component) > 1 or node in graph.get(node, ()):
+                            cycles.append(component + [node])
+
+        return cycles
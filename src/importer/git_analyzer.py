@@ -2,13 +2,14 @@
 """
 Git history analyzer for project import
 """
+import os
 import subprocess
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Iterable, Optional, Dict
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GitInfo:
     """Git information for a file"""
     commit_hash: Optional[str] = None
@@ -23,8 +24,14 @@ class GitAnalyzer:
 
     def __init__(self, project_root: str):
         self.project_root = Path(project_root).resolve()
+        # Paths handed to us are always under the root; slicing beats relative_to()
+        self._root_prefix = os.path.join(str(self.project_root), '')
         self._is_git_repo = self._check_git_repo()
         self._git_author = self._get_git_author() if self._is_git_repo else None
+        # The branch can't change mid-import; resolve it once
+        self._branch = self._fetch_branch()
+        # Filled by prefetch_all(); get_file_info() falls back to git per file
+        self._file_info_cache: Dict[str, GitInfo] = {}
 
     def _check_git_repo(self) -> bool:
         """Check if project root is a git repository"""
@@ -43,27 +50,38 @@ class GitAnalyzer:
     def _get_git_author(self) -> Dict[str, str]:
         """Get git config author info"""
         try:
-            name = subprocess.run(
-                ['git', 'config', 'user.name'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=5
-            ).stdout.strip()
-
-            email = subprocess.run(
-                ['git', 'config', 'user.email'],
+            # One git call for both keys; later (more specific) config wins
+            result = subprocess.run(
+                ['git', 'config', '--get-regexp', r'^user\.(name|email)$'],
                 cwd=self.project_root,
                 capture_output=True,
                 text=True,
                 timeout=5
-            ).stdout.strip()
-
-            return {'name': name or 'unknown', 'email': email or 'unknown@localhost'}
+            )
+            values = {}
+            for line in result.stdout.splitlines():
+                key, _, value = line.partition(' ')
+                values[key] = value.strip()
+
+            return {
+                'name': values.get('user.name') or 'unknown',
+                'email': values.get('user.email') or 'unknown@localhost'
+            }
         except Exception:
             return {'name': 'unknown', 'email': 'unknown@localhost'}
 
-    def get_current_branch(self) -> Optional[str]:
+    def _relative_path(self, file_path: Path) -> str:
+        """Path of a file under the project root, relative to it"""
+        abs_path = str(file_path)
+        assert abs_path.startswith(self._root_prefix), abs_path
+        return abs_path[len(self._root_prefix):]
+
+    @property
+    def branch(self) -> Optional[str]:
+        """Current git branch, resolved when the analyzer was created"""
+        return self._branch
+
+    def _fetch_branch(self) -> Optional[str]:
         """Get current git branch"""
         if not self._is_git_repo:
             return None
@@ -81,12 +99,80 @@ class GitAnalyzer:
         except Exception:
             return None
 
+    def prefetch_all(self, file_paths: Iterable[Path]) -> Dict[str, GitInfo]:
+        """Resolve git information for many files with a single `git log`.
+
+        Walks HEAD's history newest first, like `git log -1 -- <path>` does per
+        file, and stops reading as soon as every requested path has been seen.
+        Results are cached for get_file_info().
+        """
+        if not self._is_git_repo:
+            return {}
+
+        wanted = {self._relative_path(p) for p in file_paths}
+        wanted -= self._file_info_cache.keys()
+        if not wanted:
+            return self._file_info_cache
+
+        branch = self._branch
+        process = subprocess.Popen(
+            ['git', 'log', '-z', '--name-only', '--relative', '--format=%x01%H%x1f%an%x1f%ae%x1f%ai'],
+            cwd=self.project_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+        # Output is NUL-separated: "\x01<header>" per commit, then the paths
+        # it touched (the first one prefixed with a newline)
+        info = None
+        pending = b''
+        try:
+            while wanted:
+                chunk = process.stdout.read(65536)
+                if not chunk:
+                    break
+                *tokens, pending = (pending + chunk).split(b'\0')
+                for token in tokens:
+                    if token.startswith(b'\n'):
+                        token = token[1:]
+                    if token.startswith(b'\x01'):
+                        fields = token[1:].decode('utf-8', errors='replace').split('\x1f')
+                        commit_hash, author, email, timestamp = (fields + [''] * 4)[:4]
+                        info = GitInfo(
+                            commit_hash=commit_hash.strip() or None,
+                            author=author.strip() or None,
+                            email=email.strip() or None,
+                            timestamp=timestamp.strip() or None,
+                            branch=branch
+                        )
+                        continue
+
+                    rel_path = os.fsdecode(token)
+                    if info and rel_path in wanted:
+                        self._file_info_cache[rel_path] = info
+                        wanted.discard(rel_path)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+        # Never committed (untracked, or an empty history)
+        for rel_path in wanted:
+            self._file_info_cache[rel_path] = GitInfo(branch=branch)
+
+        return self._file_info_cache
+
     def get_file_info(self, file_path: Path) -> GitInfo:
         """Get git information for a specific file"""
         if not self._is_git_repo:
             return GitInfo()
 
-        rel_path = str(file_path.relative_to(self.project_root))
+        rel_path = self._relative_path(file_path)
+
+        cached = self._file_info_cache.get(rel_path)
+        if cached:
+            return cached
 
         try:
             # Get last commit hash
@@ -129,15 +215,12 @@ class GitAnalyzer:
             )
             timestamp = timestamp_result.stdout.strip() or None
 
-            # Get current branch
-            branch = self.get_current_branch()
-
             return GitInfo(
                 commit_hash=commit_hash,
                 author=author,
                 email=email,
                 timestamp=timestamp,
-                branch=branch
+                branch=self._branch
             )
         except Exception:
             return GitInfo()
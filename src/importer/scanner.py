@@ -2,9 +2,12 @@
 """
 File scanner and type detector for project import
 """
+import mmap
 import os
 import re
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Set
 from dataclasses import dataclass
@@ -194,6 +197,154 @@ FILE_TYPE_PATTERNS = [
     (r'\.md$', 'markdown', None),
 ]
 
+# Pattern classification for the get_file_type dispatch table
+_MATCH_ANY = 0       # key match alone decides (pattern is just r'\.ext$')
+_MATCH_SUFFIX = 1    # rel_path.endswith(literal)
+_MATCH_CONTAINS = 2  # literal in rel_path
+_MATCH_REGEX = 3     # compiled.search(rel_path)
+
+_LITERAL_RE = re.compile(r'(?:[^\\.^$*+?{}\[\]|()]|\\\.)+')
+_EXT_TAIL_RE = re.compile(r'[\w-]+')
+_EXT_GROUP_RE = re.compile(r'\(([\w|-]+)\)')
+_EXT_OPTIONAL_RE = re.compile(r'([\w-]*)([\w-])\?([\w-]*)')
+
+
+def _path_key(name: str) -> str:
+    """Dispatch key of a file name: text from its last '.', or '' without one"""
+    dot = name.rfind('.')
+    return name[dot:] if dot >= 0 else ''
+
+
+def _compile_pattern(pattern: str) -> Tuple[int, object, Optional[Set[str]]]:
+    """Classify a FILE_TYPE_PATTERNS regex as (match kind, argument, dispatch keys).
+
+    Keys are the only _path_key values a matching path can have; None means the
+    pattern has to be tried for every path.
+    """
+    anchored = pattern.endswith('$')
+    body = pattern[:-1] if anchored else pattern
+
+    if _LITERAL_RE.fullmatch(body):
+        literal = body.replace('\\.', '.')
+        if not anchored:
+            return _MATCH_CONTAINS, literal, None
+        dot = literal.rfind('.')
+        if dot < 0 or '/' in literal[dot:]:
+            return _MATCH_SUFFIX, literal, None
+        kind = _MATCH_ANY if dot == 0 else _MATCH_SUFFIX
+        return kind, literal, {literal[dot:]}
+
+    keys = None
+    dot = body.rfind('\\.')
+    if anchored and dot >= 0:
+        tail = body[dot + 2:]
+        if _EXT_TAIL_RE.fullmatch(tail):
+            keys = {'.' + tail}
+        elif match := _EXT_GROUP_RE.fullmatch(tail):
+            keys = {'.' + ext for ext in match.group(1).split('|')}
+        elif match := _EXT_OPTIONAL_RE.fullmatch(tail):
+            head, optional, rest = match.groups()
+            keys = {'.' + head + optional + rest, '.' + head + rest}
+    return _MATCH_REGEX, re.compile(pattern), keys
+
+
+def _build_dispatch():
+    """Index FILE_TYPE_PATTERNS by _path_key, keeping first-match order per key.
+
+    Returns the per-key candidate lists with and without the unkeyed patterns,
+    the unkeyed patterns alone, and one regex that matches wherever any
+    unkeyed pattern could, so most paths can skip them in a single scan.
+    """
+    keyed: Dict[str, List[int]] = {}
+    unkeyed: List[int] = []
+    entries = []
+    gate_parts = []
+
+    for index, (pattern, type_name, test_func) in enumerate(FILE_TYPE_PATTERNS):
+        kind, arg, keys = _compile_pattern(pattern)
+        entries.append((kind, arg, type_name, test_func))
+        if keys is None:
+            unkeyed.append(index)
+            gate_parts.append(pattern if kind == _MATCH_REGEX else re.escape(arg))
+        else:
+            for key in keys:
+                keyed.setdefault(key, []).append(index)
+
+    with_unkeyed = {
+        key: [entries[i] for i in sorted(indices + unkeyed)]
+        for key, indices in keyed.items()
+    }
+    keyed_only = {
+        key: [entries[i] for i in indices]
+        for key, indices in keyed.items()
+    }
+    gate = re.compile('|'.join(f'(?:{part})' for part in gate_parts))
+    return with_unkeyed, keyed_only, [entries[i] for i in unkeyed], gate
+
+
+# Candidate patterns per file-name key, with and without the patterns every
+# path may have to try, and the single-pass check that decides between them
+_DISPATCH, _DISPATCH_KEYED, _UNKEYED, _UNKEYED_GATE = _build_dispatch()
+
+# Keys whose first keyed candidate is a bare r'\.ext$' with no test: outside the
+# gate the type follows from the key alone
+_PURE_EXT_TYPES = {
+    key: candidates[0][2]
+    for key, candidates in _DISPATCH_KEYED.items()
+    if candidates[0][0] == _MATCH_ANY and candidates[0][3] is None
+}
+
+# Component/function name patterns per extension, in order of preference
+_JS_COMPONENT_PATTERNS = (
+    # export function ComponentName / export const ComponentName
+    re.compile(r'export\s+(?:default\s+)?(?:function|const)\s+(\w+)'),
+    # function ComponentName
+    re.compile(r'function\s+(\w+)'),
+    re.compile(r'export\s+default\s+(\w+)'),
+)
+_COMPONENT_PATTERNS = {
+    **dict.fromkeys(('.jsx', '.tsx', '.ts', '.js', '.cjs', '.mjs'), _JS_COMPONENT_PATTERNS),
+    # Python: class or function name
+    '.py': (
+        re.compile(r'class\s+(\w+)'),
+        re.compile(r'def\s+(\w+)'),
+    ),
+    '.rs': (
+        re.compile(r'pub\s+fn\s+(\w+)'),
+        re.compile(r'fn\s+(\w+)'),
+        re.compile(r'pub\s+struct\s+(\w+)'),
+        re.compile(r'struct\s+(\w+)'),
+    ),
+    '.go': (
+        re.compile(r'func\s+(\w+)'),
+        re.compile(r'type\s+(\w+)'),
+    ),
+    '.rb': (
+        re.compile(r'class\s+(\w+)'),
+        re.compile(r'module\s+(\w+)'),
+        re.compile(r'def\s+(\w+)'),
+    ),
+}
+
+# Line boundaries str.splitlines() recognizes besides \n and \r, for ASCII
+# text and in general (substring checks beat a regex character class here)
+_OTHER_ASCII_LINE_BREAKS = ('\x0b', '\x0c', '\x1c', '\x1d', '\x1e')
+_OTHER_LINE_BREAKS = _OTHER_ASCII_LINE_BREAKS + ('\x85', '\u2028', '\u2029')
+
+# Anything splitlines() treats as a line break besides '\n', as UTF-8 bytes.
+# Mapped files without any of these (and without a trailing partial character)
+# are counted straight from the bytes
+_OTHER_LINE_BREAK_BYTES = (
+    b'\r', b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e', b'\xc2\x85', b'\xe2\x80\xa8', b'\xe2\x80\xa9'
+)
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 256 * 1024
+_MMAP_COUNT_CHUNK = 1024 * 1024
+
+# Threads reading file contents in scan_directory
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 # Directories to skip during scanning
 SKIP_DIRS = {
     'node_modules', '.git', 'venv', '__pycache__',
@@ -203,7 +354,7 @@ SKIP_DIRS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class ScannedFile:
     """Represents a scanned file"""
     absolute_path: str
@@ -219,6 +370,8 @@ class FileScanner:
 
     def __init__(self, project_root: str):
         self.project_root = Path(project_root).resolve()
+        # Paths handed to us are always under the root; slicing beats relative_to()
+        self._root_prefix = os.path.join(str(self.project_root), '')
         self._git_files: Optional[Set[str]] = self._load_git_files()
 
     def _load_git_files(self) -> Optional[Set[str]]:
@@ -244,139 +397,163 @@ class FileScanner:
 
     def get_file_type(self, file_path: Path) -> Optional[str]:
         """Detect file type based on patterns"""
-        rel_path = str(file_path.relative_to(self.project_root))
+        abs_path = str(file_path)
+        assert abs_path.startswith(self._root_prefix), abs_path
+        rel_path = abs_path[len(self._root_prefix):]
+        return self._classify(rel_path, file_path.name)
+
+    def _classify(self, rel_path: str, file_name: str) -> Optional[str]:
+        """get_file_type() for a path already made relative to the project root"""
+        # Only patterns that can match this file name's extension, in order
+        key = _path_key(file_name)
+        if _UNKEYED_GATE.search(rel_path):
+            candidates = _DISPATCH.get(key, _UNKEYED)
+        else:
+            type_name = _PURE_EXT_TYPES.get(key)
+            if type_name:
+                return type_name
+            candidates = _DISPATCH_KEYED.get(key, ())
 
-        for pattern, type_name, test_func in FILE_TYPE_PATTERNS:
-            if re.search(pattern, rel_path):
-                if test_func and not test_func(rel_path):
+        for kind, arg, type_name, test_func in candidates:
+            if kind == _MATCH_SUFFIX:
+                if not rel_path.endswith(arg):
                     continue
-                return type_name
+            elif kind == _MATCH_CONTAINS:
+                if arg not in rel_path:
+                    continue
+            elif kind == _MATCH_REGEX:
+                if not arg.search(rel_path):
+                    continue
+            if test_func and not test_func(rel_path):
+                continue
+            return type_name
 
         return None
 
     def extract_component_name(self, file_path: Path, content: str) -> str:
         """Extract component/function name from file content"""
-        ext = file_path.suffix
-        file_name = file_path.stem
-
-        # For JS/TS files, try to extract component name
-        if ext in {'.jsx', '.tsx', '.ts', '.js', '.cjs', '.mjs'}:
-            # Match: export function ComponentName / export const ComponentName / function ComponentName
-            patterns = [
-                r'export\s+(?:default\s+)?(?:function|const)\s+(\w+)',
-                r'function\s+(\w+)',
-                r'export\s+default\s+(\w+)',
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-
-        # For Python files, try to extract class or function name
-        elif ext == '.py':
-            patterns = [
-                r'class\s+(\w+)',
-                r'def\s+(\w+)',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-
-        # For Rust files
-        elif ext == '.rs':
-            patterns = [
-                r'pub\s+fn\s+(\w+)',
-                r'fn\s+(\w+)',
-                r'pub\s+struct\s+(\w+)',
-                r'struct\s+(\w+)',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-
-        # For Go files
-        elif ext == '.go':
-            patterns = [
-                r'func\s+(\w+)',
-                r'type\s+(\w+)',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-
-        # For Ruby files
-        elif ext == '.rb':
-            patterns = [
-                r'class\s+(\w+)',
-                r'module\s+(\w+)',
-                r'def\s+(\w+)',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-
-        return file_name
+        # Patterns are tried in order of preference; each searches the whole file
+        for pattern in _COMPONENT_PATTERNS.get(file_path.suffix, ()):
+            match = pattern.search(content)
+            if match:
+                return match.group(1)
 
-    def count_lines(self, content: str) -> int:
-        """Count lines in file"""
-        return len(content.splitlines())
+        return file_path.stem
 
-    def scan_directory(self) -> List[ScannedFile]:
-        """Recursively scan directory and return list of tracked files"""
-        scanned_files = []
+    def count_lines(self, content: str) -> int:
+        """Count lines in file (same result as len(content.splitlines()))"""
+        if not content:
+            return 0
+        # splitlines() also breaks on these; rare enough to take the slow path
+        breaks = _OTHER_ASCII_LINE_BREAKS if content.isascii() else _OTHER_LINE_BREAKS
+        if any(sep in content for sep in breaks):
+            return len(content.splitlines())
+        # Text read with universal newlines only has '\n' left to count
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        lines = content.count('\n')
+        return lines if content[-1] == '\n' else lines + 1
+
+    def _count_mapped_lines(self, data: mmap.mmap) -> int:
+        """count_lines() for a mapped UTF-8 file, decoding only when it has to"""
+        # Probing the lead byte first keeps this a memchr() for ASCII files
+        if data[-1] >= 0x80 or any(
+            data.find(sep[:1]) != -1 and data.find(sep) != -1 for sep in _OTHER_LINE_BREAK_BYTES
+        ):
+            return self.count_lines(str(data, 'utf-8', 'ignore'))
+        lines = sum(
+            data[i:i + _MMAP_COUNT_CHUNK].count(b'\n')
+            for i in range(0, len(data), _MMAP_COUNT_CHUNK)
+        )
+        return lines if data[-1] == 0x0a else lines + 1
+
+    def _scan_mapped_file(self, file_path: Path) -> Tuple[str, int]:
+        """Component name and line count of a large file, via mmap"""
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Only files with component patterns need the text at all
+            if file_path.suffix not in _COMPONENT_PATTERNS:
+                return file_path.stem, self._count_mapped_lines(data)
+            # Untranslated '\r' doesn't change either result
+            content = str(data, 'utf-8', 'ignore')
+        return self.extract_component_name(file_path, content), self.count_lines(content)
+
+    def _scan_file(self, entry: os.DirEntry, rel_path: str, file_type: str) -> Optional[ScannedFile]:
+        """Read one classified file and extract its metadata (runs in a worker thread)"""
+        file_path = Path(entry.path)
+
+        # Read content for analysis (also skips broken symlinks)
+        try:
+            if entry.stat().st_size >= MMAP_THRESHOLD:
+                component_name, lines_of_code = self._scan_mapped_file(file_path)
+            else:
+                content = file_path.read_text(encoding='utf-8', errors='ignore')
 
-        for root, dirs, files in os.walk(self.project_root):
-            # Filter out directories to skip
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                # Extract metadata
+                component_name = self.extract_component_name(file_path, content)
+                lines_of_code = self.count_lines(content)
+        except Exception:
+            # Skip files that can't be read
+            return None
 
-            for file_name in files:
-                file_path = Path(root) / file_name
+        return ScannedFile(
+            absolute_path=entry.path,
+            relative_path=rel_path,
+            file_name=entry.name,
+            file_type=file_type,
+            component_name=component_name,
+            lines_of_code=lines_of_code
+        )
 
-                # Skip if it's a broken symlink
-                if not file_path.exists():
+    def scan_directory(self) -> List[ScannedFile]:
+        """Recursively scan directory and return list of tracked files"""
+        candidates = []
+
+        # Walk and classify on this thread; only tracked files get read.
+        # Same depth-first order as os.walk, but DirEntry gives the file type
+        # without a stat and no Path is built for files that aren't tracked.
+        stack = [(str(self.project_root), '')]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    # Skip filtered directories; like os.walk, don't follow symlinks
+                    if entry.name not in SKIP_DIRS and not entry.is_symlink():
+                        subdirs.append((entry.path, rel_dir + entry.name + os.sep))
                     continue
 
-                rel_path = str(file_path.relative_to(self.project_root))
+                rel_path = rel_dir + entry.name
 
                 # If in a git repo, respect .gitignore by filtering against git's file list
                 if self._git_files is not None and rel_path not in self._git_files:
                     continue
 
                 # Detect file type
-                file_type = self.get_file_type(file_path)
+                file_type = self._classify(rel_path, entry.name)
                 if not file_type:
                     continue
 
-                # Read content for analysis
-                try:
-                    content = file_path.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    # Skip files that can't be read
-                    continue
-
-                # Extract metadata
-                component_name = self.extract_component_name(file_path, content)
-                lines_of_code = self.count_lines(content)
+                candidates.append((entry, rel_path, file_type))
 
-                scanned_files.append(ScannedFile(
-                    absolute_path=str(file_path),
-                    relative_path=rel_path,
-                    file_name=file_name,
-                    file_type=file_type,
-                    component_name=component_name,
-                    lines_of_code=lines_of_code
-                ))
+            stack.extend(reversed(subdirs))
 
-        return scanned_files
+        # Reads release the GIL, so overlap them; map() keeps walk order
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            results = pool.map(lambda args: self._scan_file(*args), candidates)
+            return [scanned for scanned in results if scanned is not None]
 
     def get_type_distribution(self, files: List[ScannedFile]) -> Dict[str, int]:
         """Get distribution of file types"""
-        distribution = {}
-        for file in files:
-            distribution[file.file_type] = distribution.get(file.file_type, 0) + 1
-        return dict(sorted(distribution.items(), key=lambda x: x[1], reverse=True))
+        # most_common() is a stable sort by count, so ties keep first-seen order
+        return dict(Counter(file.file_type for file in files).most_common())
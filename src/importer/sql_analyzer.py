@@ -4,10 +4,16 @@ SQL schema analyzer - extracts database objects from SQL files
 """
 import re
 import json
+import mmap
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+# SQL files at least this large are decoded straight from an mmap
+MMAP_THRESHOLD = 256 * 1024
+
 
 @dataclass
 class SqlObject:
@@ -28,6 +34,10 @@ class SqlObject:
 class SqlAnalyzer:
     """Analyzes SQL files to extract database objects"""
 
+    # Bump whenever analyze_sql_file output changes; the importer's
+    # sql_analysis_cache discards analyses recorded under other versions
+    CACHE_VERSION = 1
+
     # Regex patterns for SQL objects
     PATTERNS = {
         'table': re.compile(r'CREATE\s+(?:UNLOGGED\s+)?(?:TEMPORARY\s+|TEMP\s+)?TABLE(?:\s+IF\s+NOT\s+EXISTS)?\s+([\w.]+)\s*\(', re.IGNORECASE),
@@ -53,18 +63,54 @@ class SqlAnalyzer:
         'server': re.compile(r'CREATE\s+SERVER\s+([\w.]+)', re.IGNORECASE),
     }
 
+    # Keyword every match of a PATTERNS entry contains, lowercased
+    PATTERN_KEYWORDS = {
+        'table': 'table',
+        'view': 'view',
+        'materialized_view': 'materialized',
+        'function': 'function',
+        'procedure': 'procedure',
+        'trigger': 'trigger',
+        'index': 'index',
+        'type': 'type',
+        'sequence': 'sequence',
+        'schema': 'schema',
+        'extension': 'extension',
+        'policy': 'policy',
+        'domain': 'domain',
+        'aggregate': 'aggregate',
+        'operator': 'operator',
+        'cast': 'cast',
+        'foreign_table': 'foreign',
+        'server': 'server',
+    }
+
+    # Every RLS statement / policy in a file, for indexing them once per file
+    RLS_ENABLED_PATTERN = re.compile(
+        r'ALTER\s+TABLE\s+(\S+)\s+ENABLE\s+ROW\s+LEVEL\s+SECURITY', re.IGNORECASE
+    )
+    POLICY_TARGET_PATTERN = re.compile(r'CREATE\s+POLICY\s+(\w+)\s+ON\s+([\w.]*)', re.IGNORECASE)
+
+    LANGUAGE_PATTERN = re.compile(r'LANGUAGE\s+(\w+)', re.IGNORECASE)
+    PARAMETER_PATTERN = re.compile(r'(\w+)\s+([\w\[\]]+)', re.IGNORECASE)
+    REFERENCES_PATTERN = re.compile(r'REFERENCES\s+\w+', re.IGNORECASE)
+    TABLE_START_PATTERN = re.compile(r'CREATE\s+TABLE', re.IGNORECASE)
+
     @staticmethod
     def parse_schema_and_name(full_name: str) -> Tuple[str, str]:
         """Parse schema and object name from full name"""
-        parts = full_name.split('.')
-        if len(parts) == 2:
-            return parts[0], parts[1]
-        return 'public', full_name
+        if '.' not in full_name:
+            return 'public', full_name
+        schema, _, name = full_name.partition('.')
+        # Names with more than one dot stay whole under 'public'
+        if '.' in name:
+            return 'public', full_name
+        return schema, name
 
     @staticmethod
     def extract_function_language(sql_block: str) -> str:
         """Extract function language from SQL block"""
-        match = re.search(r'LANGUAGE\s+(\w+)', sql_block, re.IGNORECASE)
+        match = SqlAnalyzer.LANGUAGE_PATTERN.search(sql_block)
         return match.group(1).lower() if match else 'sql'
 
     @staticmethod
@@ -75,75 +121,172 @@ class SqlAnalyzer:
 
         params = []
         # Simple parameter parsing
-        param_matches = re.findall(r'(\w+)\s+([\w\[\]]+)', param_string, re.IGNORECASE)
+        param_matches = SqlAnalyzer.PARAMETER_PATTERN.findall(param_string)
 
         for name, type_name in param_matches:
             params.append({'name': name, 'type': type_name})
 
         return params
 
+    # Per-table patterns are compiled once per name; names recur across files
     @staticmethod
-    def has_rls(table_name: str, sql_content: str) -> bool:
-        """Check if table has RLS enabled"""
-        pattern = re.compile(
+    @lru_cache(maxsize=1024)
+    def _rls_pattern(table_name: str) -> re.Pattern:
+        return re.compile(
             rf'ALTER\s+TABLE\s+{re.escape(table_name)}\s+ENABLE\s+ROW\s+LEVEL\s+SECURITY',
             re.IGNORECASE
         )
-        return bool(pattern.search(sql_content))
 
     @staticmethod
-    def extract_rls_policies(table_name: str, sql_content: str) -> List[str]:
-        """Extract RLS policy names for a table"""
-        policies = []
-        pattern = re.compile(
+    @lru_cache(maxsize=1024)
+    def _policy_pattern(table_name: str) -> re.Pattern:
+        return re.compile(
             rf'CREATE\s+POLICY\s+(\w+)\s+ON\s+{re.escape(table_name)}',
             re.IGNORECASE
         )
 
-        for match in pattern.finditer(sql_content):
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _name_pattern(table_name: str) -> re.Pattern:
+        return re.compile(re.escape(table_name), re.IGNORECASE)
+
+    @staticmethod
+    def has_rls(table_name: str, sql_content: str) -> bool:
+        """Check if table has RLS enabled"""
+        return bool(SqlAnalyzer._rls_pattern(table_name).search(sql_content))
+
+    @staticmethod
+    def extract_rls_policies(table_name: str, sql_content: str) -> List[str]:
+        """Extract RLS policy names for a table"""
+        policies = []
+
+        for match in SqlAnalyzer._policy_pattern(table_name).finditer(sql_content):
             policies.append(match.group(1))
 
         return policies
 
-    @staticmethod
-    def has_foreign_keys(table_name: str, sql_content: str) -> bool:
-        """Check if table has foreign keys"""
-        # Find the CREATE TABLE block for this table
-        table_pattern = re.compile(
-            rf'CREATE\s+TABLE[^;]*?{re.escape(table_name)}[\s\S]*?\);',
-            re.IGNORECASE
-        )
-        table_match = table_pattern.search(sql_content)
+    @classmethod
+    def _create_table_spans(cls, sql_content: str) -> List[Tuple[int, int, int]]:
+        """(start, end of 'CREATE TABLE', first ';' after it) for each CREATE TABLE"""
+        spans = []
+        for match in cls.TABLE_START_PATTERN.finditer(sql_content):
+            semicolon = sql_content.find(';', match.end())
+            spans.append((match.start(), match.end(), semicolon if semicolon >= 0 else len(sql_content)))
+        return spans
 
-        if table_match:
-            table_block = table_match.group(0)
-            return bool(re.search(r'REFERENCES\s+\w+', table_block, re.IGNORECASE))
+    @staticmethod
+    def has_foreign_keys(table_name: str, sql_content: str,
+                         create_tables: Optional[List[Tuple[int, int, int]]] = None) -> bool:
+        """Check if table has foreign keys
+
+        The table's block is the first CREATE TABLE that mentions the name
+        before its first ';', up to the next ');' after the name. Pass
+        _create_table_spans() when checking many tables of one file.
+        """
+        if create_tables is None:
+            create_tables = SqlAnalyzer._create_table_spans(sql_content)
+
+        # Bounded searches instead of one regex with lazy wildcards on both
+        # sides of the name, which backtracks quadratically on large files
+        name_pattern = SqlAnalyzer._name_pattern(table_name)
+        for start, name_from, semicolon in create_tables:
+            name_match = name_pattern.search(sql_content, name_from, semicolon)
+            if not name_match:
+                continue
+
+            block_end = sql_content.find(');', name_match.end())
+            if block_end < 0:
+                # No later CREATE TABLE can close either
+                return False
+            return bool(SqlAnalyzer.REFERENCES_PATTERN.search(sql_content, start, block_end + 2))
 
         return False
 
+    @classmethod
+    def _index_rls(cls, sql_content: str) -> Tuple[set, Dict[str, List[str]]]:
+        """Index a file's RLS statements and policies by lowercased table name.
+
+        Gives has_rls() / extract_rls_policies() results for every table from
+        two scans. Policies are keyed by every prefix of their target, since
+        extract_rls_policies() doesn't require the name to end there. Only
+        valid for ASCII content, where IGNORECASE is plain lower().
+        """
+        rls_tables = {
+            match.group(1).lower() for match in cls.RLS_ENABLED_PATTERN.finditer(sql_content)
+        }
+
+        policies_by_table: Dict[str, List[str]] = {}
+        for match in cls.POLICY_TARGET_PATTERN.finditer(sql_content):
+            policy, target = match.group(1), match.group(2).lower()
+            for end in range(1, len(target) + 1):
+                policies_by_table.setdefault(target[:end], []).append(policy)
+
+        return rls_tables, policies_by_table
+
+    @staticmethod
+    def _read_sql(file_path: Path) -> str:
+        """Read a SQL file as text, with newlines normalized like read_text()
+
+        Large files are decoded directly from a read-only mapping, which skips
+        the intermediate bytes copy read_text() makes (half the peak memory).
+        """
+        if file_path.stat().st_size < MMAP_THRESHOLD:
+            return file_path.read_text(encoding='utf-8')
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = str(data, 'utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
     @classmethod
     def analyze_sql_file(cls, file_path: Path) -> List[SqlObject]:
         """Analyze SQL file and extract all database objects"""
-        sql_content = file_path.read_text(encoding='utf-8')
+        sql_content = cls._read_sql(file_path)
         objects = []
 
+        # For ASCII files (nearly all), skip patterns whose keyword never occurs
+        # and answer the per-table RLS checks from one index instead of a scan
+        # per table. Elsewhere IGNORECASE folding is subtler than lower().
+        if sql_content.isascii():
+            lowered = sql_content.lower()
+            rls_index = cls._index_rls(sql_content)
+        else:
+            lowered = rls_index = None
+
+        def finditer(kind: str):
+            if lowered is not None and cls.PATTERN_KEYWORDS[kind] not in lowered:
+                return ()
+            return cls.PATTERNS[kind].finditer(sql_content)
+
         # Extract tables
-        for match in cls.PATTERNS['table'].finditer(sql_content):
+        create_tables = None
+        for match in finditer('table'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
+            if create_tables is None:
+                create_tables = cls._create_table_spans(sql_content)
+
+            if rls_index is not None:
+                rls_tables, policies_by_table = rls_index
+                has_rls_enabled = full_name.lower() in rls_tables
+                rls_policies = list(policies_by_table.get(full_name.lower(), ()))
+            else:
+                has_rls_enabled = cls.has_rls(full_name, sql_content)
+                rls_policies = cls.extract_rls_policies(full_name, sql_content)
+
             objects.append(SqlObject(
                 object_type='table',
                 schema_name=schema,
                 object_name=name,
                 full_name=full_name,
-                has_rls_enabled=cls.has_rls(full_name, sql_content),
-                rls_policies=cls.extract_rls_policies(full_name, sql_content),
-                has_foreign_keys=cls.has_foreign_keys(full_name, sql_content)
+                has_rls_enabled=has_rls_enabled,
+                rls_policies=rls_policies,
+                has_foreign_keys=cls.has_foreign_keys(full_name, sql_content, create_tables)
             ))
 
         # Extract views
-        for match in cls.PATTERNS['view'].finditer(sql_content):
+        for match in finditer('view'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -155,7 +298,7 @@ class SqlAnalyzer:
             ))
 
         # Extract materialized views
-        for match in cls.PATTERNS['materialized_view'].finditer(sql_content):
+        for match in finditer('materialized_view'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -167,8 +310,11 @@ class SqlAnalyzer:
                 table_type='materialized_view'
             ))
 
-        # Extract functions
-        for match in cls.PATTERNS['function'].finditer(sql_content):
+        # Extract functions. Matches arrive in file order, so the next '$$;' or
+        # ';' found for one function is reused until a later match passes it
+        # (and -1, none left, stays final), keeping terminator scans linear.
+        next_dollar_end = next_semicolon = -2  # not searched yet
+        for match in finditer('function'):
             full_name = match.group(1)
             param_string = match.group(2)
             return_type = match.group(3).strip()
@@ -176,9 +322,13 @@ class SqlAnalyzer:
 
             # Find full function block to extract language
             function_start = match.start()
-            function_end_match = sql_content.find('$$;', function_start)
+            if next_dollar_end != -1 and next_dollar_end < function_start:
+                next_dollar_end = sql_content.find('$$;', function_start)
+            function_end_match = next_dollar_end
             if function_end_match == -1:
-                function_end_match = sql_content.find(';', function_start)
+                if next_semicolon != -1 and next_semicolon < function_start:
+                    next_semicolon = sql_content.find(';', function_start)
+                function_end_match = next_semicolon
             function_block = sql_content[function_start:function_end_match + 3]
 
             objects.append(SqlObject(
@@ -192,7 +342,7 @@ class SqlAnalyzer:
             ))
 
         # Extract triggers
-        for match in cls.PATTERNS['trigger'].finditer(sql_content):
+        for match in finditer('trigger'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -204,7 +354,7 @@ class SqlAnalyzer:
             ))
 
         # Extract types (enums)
-        for match in cls.PATTERNS['type'].finditer(sql_content):
+        for match in finditer('type'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -216,7 +366,7 @@ class SqlAnalyzer:
             ))
 
         # Extract procedures
-        for match in cls.PATTERNS['procedure'].finditer(sql_content):
+        for match in finditer('procedure'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -228,7 +378,7 @@ class SqlAnalyzer:
             ))
 
         # Extract indexes
-        for match in cls.PATTERNS['index'].finditer(sql_content):
+        for match in finditer('index'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -240,7 +390,7 @@ class SqlAnalyzer:
             ))
 
         # Extract sequences
-        for match in cls.PATTERNS['sequence'].finditer(sql_content):
+        for match in finditer('sequence'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -252,7 +402,7 @@ class SqlAnalyzer:
             ))
 
         # Extract schemas
-        for match in cls.PATTERNS['schema'].finditer(sql_content):
+        for match in finditer('schema'):
             full_name = match.group(1)
 
             objects.append(SqlObject(
@@ -263,7 +413,7 @@ class SqlAnalyzer:
             ))
 
         # Extract extensions
-        for match in cls.PATTERNS['extension'].finditer(sql_content):
+        for match in finditer('extension'):
             full_name = match.group(1)
 
             objects.append(SqlObject(
@@ -274,7 +424,7 @@ class SqlAnalyzer:
             ))
 
         # Extract policies
-        for match in cls.PATTERNS['policy'].finditer(sql_content):
+        for match in finditer('policy'):
             policy_name = match.group(1)
             table_name = match.group(2)
 
@@ -286,7 +436,7 @@ class SqlAnalyzer:
             ))
 
         # Extract domains
-        for match in cls.PATTERNS['domain'].finditer(sql_content):
+        for match in finditer('domain'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -298,7 +448,7 @@ class SqlAnalyzer:
             ))
 
         # Extract aggregates
-        for match in cls.PATTERNS['aggregate'].finditer(sql_content):
+        for match in finditer('aggregate'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -310,7 +460,7 @@ class SqlAnalyzer:
             ))
 
         # Extract operators
-        for match in cls.PATTERNS['operator'].finditer(sql_content):
+        for match in finditer('operator'):
             operator_name = match.group(1)
 
             objects.append(SqlObject(
@@ -321,7 +471,7 @@ class SqlAnalyzer:
             ))
 
         # Extract casts
-        for match in cls.PATTERNS['cast'].finditer(sql_content):
+        for match in finditer('cast'):
             from_type = match.group(1)
             to_type = match.group(2)
             cast_name = f"{from_type} AS {to_type}"
@@ -334,7 +484,7 @@ class SqlAnalyzer:
             ))
 
         # Extract foreign tables
-        for match in cls.PATTERNS['foreign_table'].finditer(sql_content):
+        for match in finditer('foreign_table'):
             full_name = match.group(1)
             schema, name = cls.parse_schema_and_name(full_name)
 
@@ -346,7 +496,7 @@ class SqlAnalyzer:
             ))
 
         # Extract servers
-        for match in cls.PATTERNS['server'].finditer(sql_content):
+        for match in finditer('server'):
             full_name = match.group(1)
 
             objects.append(SqlObject(
@@ -361,7 +511,4 @@ class SqlAnalyzer:
     @staticmethod
     def get_type_distribution(objects: List[SqlObject]) -> Dict[str, int]:
         """Get distribution of SQL object types"""
-        distribution = {}
-        for obj in objects:
-            distribution[obj.object_type] = distribution.get(obj.object_type, 0) + 1
-        return dict(sorted(distribution.items(), key=lambda x: x[1], reverse=True))
+        return dict(Counter(obj.object_type for obj in objects).most_common())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+JSON encoding for TempleDB
+
+Uses orjson when it is installed and falls back to the json module otherwise.
+Output is compact unless indented, with non-ASCII text left unescaped as
+orjson writes it.
+"""
+import json
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize obj to JSON text, 2-space indented when indent is set"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), sort_keys=sort_keys, ensure_ascii=False)
@@ -5,33 +5,65 @@ Generates context and explanations for AI agents working with templeDB
 """
 
 import os
-import sqlite3
 import json
+from itertools import groupby
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from db_utils import get_simple_connection
+from json_utils import dumps
 
 DB_PATH = os.path.expanduser("~/.local/share/templedb/templedb.sqlite")
 
+# Tables per row-count query (SQLite caps a compound SELECT at 500 terms)
+COUNT_UNION_CHUNK = 200
+
+
+def _quote_ident(name: str) -> str:
+    """Quote an SQL identifier for interpolation into a statement"""
+    return '"' + name.replace('"', '""') + '"'
+
 
 class TempleDBContext:
     """Provides context about templeDB for LLM agents"""
 
+    # Schema overview sections: table name prefix -> description, in output order
+    SCHEMA_GROUPS = {
+        'projects': 'Core project configuration',
+        'file_': 'File tracking and metadata',
+        'vcs_': 'Version control system',
+        'deployment_': 'Deployment configuration',
+        'nix_': 'Nix configuration',
+        'env_': 'Environment variables',
+        'secret_': 'Encrypted secrets',
+    }
+
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
         self.conn = None
+        # Column info per table, valid while PRAGMA schema_version is unchanged
+        self._columns_cache: Dict[str, list] = {}
+        self._columns_version = None
+        # Last schema overview, valid while PRAGMA data_version is unchanged
+        self._overview_cache: Optional[str] = None
+        self._overview_version = None
 
     def connect(self):
         """Connect to database"""
         if not self.conn:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            # WAL, synchronous=NORMAL, in-memory temp store and a 64MB page cache
+            self.conn = get_simple_connection(self.db_path, row_factory=True)
+            # Context queries are read-only scans over views; map pages directly
+            self.conn.execute("PRAGMA mmap_size=268435456")  # 256MB mmap
 
     def close(self):
         """Close connection"""
         if self.conn:
             self.conn.close()
             self.conn = None
+            # data_version values are only comparable on the same connection
+            self._overview_cache = None
+            self._overview_version = None
 
     def __enter__(self):
         self.connect()
@@ -43,186 +75,187 @@ class TempleDBContext:
     def get_schema_overview(self) -> str:
         """Generate human-readable schema overview"""
         self.connect()
-        cursor = self.conn.cursor()
-
-        # Get all tables
-        cursor.execute("""
-            SELECT name, sql FROM sqlite_master
-            WHERE type='table' AND name NOT LIKE 'sqlite_%'
-            ORDER BY name
-        """)
-        tables = cursor.fetchall()
-
-        overview = "# TempleDB Schema Overview\n\n"
-        overview += "TempleDB is a SQLite database that stores complete project state.\n\n"
-
-        # Group tables by prefix
-        groups = {
-            'projects': 'Core project configuration',
-            'file_': 'File tracking and metadata',
-            'vcs_': 'Version control system',
-            'deployment_': 'Deployment configuration',
-            'nix_': 'Nix configuration',
-            'env_': 'Environment variables',
-            'secret_': 'Encrypted secrets',
-        }
-
-        for prefix, description in groups.items():
-            matching = [t for t in tables if t['name'].startswith(prefix)]
-            if matching:
-                overview += f"\n## {description}\n\n"
-                for table in matching:
-                    overview += f"### `{table['name']}`\n"
-                    overview += self._describe_table(table['name']) + "\n"
-
-        return overview
 
-    def _describe_table(self, table_name: str) -> str:
+        # data_version moves whenever another connection commits (this one
+        # only reads), so an unchanged value means row counts and schema are too
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._overview_cache is not None and version == self._overview_version:
+            return self._overview_cache
+
+        # Get grouped tables: each table's first matching prefix, resolved in SQL
+        prefixes = list(self.SCHEMA_GROUPS)
+        cases = ' '.join('WHEN name GLOB ? THEN ?' for _ in prefixes)
+        params = [value for i, prefix in enumerate(prefixes) for value in (prefix + '*', i)]
+        tables = self.conn.execute(f"""
+            SELECT name, grp FROM (
+                SELECT name, CASE {cases} END AS grp
+                FROM sqlite_master
+                WHERE type='table' AND name NOT LIKE 'sqlite_%'
+            )
+            WHERE grp IS NOT NULL
+            ORDER BY grp, name
+        """, params).fetchall()
+        counts = self._count_rows([table['name'] for table in tables])
+
+        parts = [
+            "# TempleDB Schema Overview\n\n",
+            "TempleDB is a SQLite database that stores complete project state.\n\n",
+        ]
+
+        descriptions = list(self.SCHEMA_GROUPS.values())
+        for grp, matching in groupby(tables, key=lambda t: t['grp']):
+            parts.append(f"\n## {descriptions[grp]}\n\n")
+            for table in matching:
+                parts.append(f"### `{table['name']}`\n")
+                parts.append(self._describe_table(table['name'], counts[table['name']]))
+                parts.append("\n")
+
+        self._overview_cache = ''.join(parts)
+        self._overview_version = version
+        return self._overview_cache
+
+    def _count_rows(self, table_names: List[str]) -> Dict[str, int]:
+        """Count rows of many tables with one UNION ALL query per chunk"""
+        counts = {}
+        for start in range(0, len(table_names), COUNT_UNION_CHUNK):
+            chunk = table_names[start:start + COUNT_UNION_CHUNK]
+            sql = ' UNION ALL '.join(
+                f'SELECT {i}, COUNT(*) FROM {_quote_ident(name)}'
+                for i, name in enumerate(chunk)
+            )
+            for i, count in self.conn.execute(sql):
+                counts[chunk[i]] = count
+        return counts
+
+    def _table_columns(self) -> Dict[str, list]:
+        """Get column info for every table, cached until the schema changes"""
+        version = self.conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version != self._columns_version:
+            columns = {}
+            for row in self.conn.execute("""
+                SELECT m.name AS table_name, p.name, p.type, p."notnull", p.pk
+                FROM sqlite_master m, pragma_table_info(m.name) p
+                WHERE m.type = 'table'
+                ORDER BY m.name, p.cid
+            """):
+                columns.setdefault(row['table_name'], []).append(row)
+            self._columns_cache = columns
+            self._columns_version = version
+        return self._columns_cache
+
+    def _describe_table(self, table_name: str, count: Optional[int] = None) -> str:
         """Describe a table's purpose and columns"""
-        cursor = self.conn.cursor()
-
         # Get columns
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
+        columns = self._table_columns().get(table_name, [])
 
         # Get row count
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        count = cursor.fetchone()[0]
+        if count is None:
+            count = self.conn.execute(
+                f'SELECT COUNT(*) FROM {_quote_ident(table_name)}'
+            ).fetchone()[0]
 
-        desc = f"**Rows**: {count}\n\n"
-        desc += "**Columns**:\n"
+        parts = [f"**Rows**: {count}\n\n", "**Columns**:\n"]
         for col in columns:
-            desc += f"- `{col['name']}` ({col['type']})"
+            parts.append(f"- `{col['name']}` ({col['type']})")
             if col['notnull']:
-                desc += " NOT NULL"
+                parts.append(" NOT NULL")
             if col['pk']:
-                desc += " PRIMARY KEY"
-            desc += "\n"
+                parts.append(" PRIMARY KEY")
+            parts.append("\n")
 
-        return desc
+        return ''.join(parts)
 
     def get_project_context(self, project_slug: str) -> Dict[str, Any]:
         """Get comprehensive context about a specific project"""
         self.connect()
-        cursor = self.conn.cursor()
 
         # Get project basics
-        cursor.execute("""
+        project = self.conn.execute("""
             SELECT * FROM projects WHERE slug = ?
-        """, (project_slug,))
-        project = cursor.fetchone()
+        """, (project_slug,)).fetchone()
 
         if not project:
             return {"error": f"Project '{project_slug}' not found"}
 
+        # Files, branches, deployments and statistics in one round trip,
+        # each section aggregated into a JSON array/object column
+        row = self.conn.execute("""
+            SELECT
+                (SELECT json_group_array(json_object(
+                        'file_path', file_path, 'type_name', type_name,
+                        'lines_of_code', lines_of_code, 'status', status,
+                        'component_name', component_name))
+                 FROM (SELECT file_path, type_name, lines_of_code, status, component_name
+                       FROM files_with_types_view
+                       WHERE project_id = :pid
+                       ORDER BY file_path
+                       LIMIT 100)) AS files,
+                (SELECT json_group_array(json_object(
+                        'branch_name', branch_name, 'is_default', is_default,
+                        'total_commits', total_commits, 'last_commit_time', last_commit_time))
+                 FROM vcs_branch_summary_view
+                 WHERE project_id = :pid) AS branches,
+                (SELECT json_group_array(json_object(
+                        'target_name', target_name, 'target_type', target_type,
+                        'provider', provider, 'region', region))
+                 FROM deployment_targets
+                 WHERE project_id = :pid) AS deployments,
+                (SELECT json_object('total_files', COUNT(*), 'total_lines', SUM(lines_of_code))
+                 FROM project_files
+                 WHERE project_id = :pid) AS file_stats,
+                (SELECT json_group_array(json_object('type_name', type_name, 'count', count))
+                 FROM (SELECT type_name, COUNT(*) as count
+                       FROM files_with_types_view
+                       WHERE project_id = :pid
+                       GROUP BY type_name
+                       ORDER BY count DESC
+                       LIMIT 10)) AS file_types
+        """, {'pid': project['id']}).fetchone()
+        files, branches, deployments, file_stats, file_types = map(json.loads, row)
+
         context = {
             "project": dict(project),
-            "files": self._get_project_files(project['id']),
-            "branches": self._get_project_branches(project['id']),
-            "deployments": self._get_project_deployments(project['id']),
-            "statistics": self._get_project_stats(project['id']),
+            "files": files,
+            "branches": branches,
+            "deployments": deployments,
+            "statistics": {
+                "files": file_stats,
+                "file_types": file_types,
+            },
         }
 
         return context
 
-    def _get_project_files(self, project_id: int) -> List[Dict]:
-        """Get files for project"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT file_path, type_name, lines_of_code, status, component_name
-            FROM files_with_types_view
-            WHERE project_id = ?
-            ORDER BY file_path
-            LIMIT 100
-        """, (project_id,))
-        return [dict(row) for row in cursor.fetchall()]
-
-    def _get_project_branches(self, project_id: int) -> List[Dict]:
-        """Get VCS branches for project"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT branch_name, is_default, total_commits, last_commit_time
-            FROM vcs_branch_summary_view
-            WHERE project_id = ?
-        """, (project_id,))
-        return [dict(row) for row in cursor.fetchall()]
-
-    def _get_project_deployments(self, project_id: int) -> List[Dict]:
-        """Get deployment targets"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT target_name, target_type, provider, region
-            FROM deployment_targets
-            WHERE project_id = ?
-        """, (project_id,))
-        return [dict(row) for row in cursor.fetchall()]
-
-    def _get_project_stats(self, project_id: int) -> Dict[str, Any]:
-        """Get project statistics"""
-        cursor = self.conn.cursor()
-
-        # File stats
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total_files,
-                SUM(lines_of_code) as total_lines
-            FROM project_files
-            WHERE project_id = ?
-        """, (project_id,))
-        file_stats = dict(cursor.fetchone())
-
-        # File types
-        cursor.execute("""
-            SELECT type_name, COUNT(*) as count
-            FROM files_with_types_view
-            WHERE project_id = ?
-            GROUP BY type_name
-            ORDER BY count DESC
-            LIMIT 10
-        """, (project_id,))
-        file_types = [dict(row) for row in cursor.fetchall()]
-
-        return {
-            "files": file_stats,
-            "file_types": file_types,
-        }
-
     def get_file_context(self, file_path: str, project_slug: str) -> Dict[str, Any]:
         """Get context about a specific file"""
         self.connect()
-        cursor = self.conn.cursor()
 
         # Get file metadata
-        cursor.execute("""
+        file_meta = self.conn.execute("""
             SELECT *
             FROM files_with_types_view
             WHERE file_path = ? AND project_slug = ?
-        """, (file_path, project_slug))
-        file_meta = cursor.fetchone()
+        """, (file_path, project_slug)).fetchone()
 
         if not file_meta:
             return {"error": f"File '{file_path}' not found in project '{project_slug}'"}
 
-        # Get content
-        cursor.execute("""
-            SELECT content_text, file_size_bytes, line_count, hash_sha256
-            FROM file_contents fc
-            JOIN project_files pf ON fc.file_id = pf.id
-            WHERE pf.file_path = ? AND pf.project_id = (
-                SELECT id FROM projects WHERE slug = ?
-            )
-        """, (file_path, project_slug))
-        content_row = cursor.fetchone()
+        # Get content info (sizes and hash only; the content itself stays in content_blobs)
+        content_row = self.conn.execute("""
+            SELECT file_size_bytes, line_count, content_hash AS hash_sha256
+            FROM file_contents
+            WHERE file_id = ? AND is_current = 1
+        """, (file_meta['id'],)).fetchone()
 
         # Get version history
-        cursor.execute("""
+        rows = self.conn.execute("""
             SELECT version_number, author, commit_message, created_at
             FROM file_version_history_view
             WHERE file_path = ? AND project_slug = ?
             ORDER BY version_number DESC
             LIMIT 10
-        """, (file_path, project_slug))
-        versions = [dict(row) for row in cursor.fetchall()]
+        """, (file_path, project_slug)).fetchall()
+        versions = [dict(row) for row in rows]
 
         context = {
             "metadata": dict(file_meta),
@@ -266,7 +299,7 @@ class TempleDBContext:
 
     def generate_llm_prompt(self, task: str, project_slug: Optional[str] = None) -> str:
         """Generate a comprehensive prompt for an LLM agent"""
-        prompt = f"""# TempleDB Context
+        parts = [f"""# TempleDB Context
 
 You are working with TempleDB, a SQLite database that stores complete project state.
 
@@ -278,30 +311,34 @@ You are working with TempleDB, a SQLite database that stores complete project st
 
 ## Schema Overview
 {self.get_schema_overview()}
-"""
+"""]
 
         if project_slug:
             context = self.get_project_context(project_slug)
-            prompt += f"\n## Current Project: {project_slug}\n"
-            prompt += f"\n### Statistics\n"
-            prompt += json.dumps(context.get('statistics', {}), indent=2)
-            prompt += f"\n\n### Files ({len(context.get('files', []))} total)\n"
-            for file in context.get('files', [])[:20]:
-                prompt += f"- {file['file_path']} ({file['type_name']}, {file['lines_of_code']} lines)\n"
-
-        prompt += "\n## Available Tools\n"
-        prompt += "- SQL queries: Use sqlite3 to query the database\n"
-        prompt += "- TUI: Run `python3 src/templedb_tui.py` for interactive editing\n"
-        prompt += "- CLI: Use `templedb` command for project management\n"
-
-        return prompt
-
-    def export_context_json(self, project_slug: str, output_path: str):
-        """Export full project context as JSON for LLM consumption"""
+            parts.append(f"\n## Current Project: {project_slug}\n")
+            parts.append("\n### Statistics\n")
+            parts.append(json.dumps(context.get('statistics', {}), indent=2))
+            parts.append(f"\n\n### Files ({len(context.get('files', []))} total)\n")
+            parts.extend(
+                f"- {file['file_path']} ({file['type_name']}, {file['lines_of_code']} lines)\n"
+                for file in context.get('files', [])[:20]
+            )
+
+        parts.append("\n## Available Tools\n")
+        parts.append("- SQL queries: Use sqlite3 to query the database\n")
+        parts.append("- TUI: Run `python3 src/templedb_tui.py` for interactive editing\n")
+        parts.append("- CLI: Use `templedb` command for project management\n")
+
+        return ''.join(parts)
+
+    def export_context_json(self, project_slug: str, output_path: str, pretty: bool = False):
+        """Export full project context as UTF-8 JSON for LLM consumption
+
+        Output is compact unless ``pretty`` is set (2-space indent).
+        """
         context = self.get_project_context(project_slug)
 
-        with open(output_path, 'w') as f:
-            json.dump(context, f, indent=2)
+        Path(output_path).write_text(dumps(context, indent=pretty), encoding='utf-8')
 
         return output_path
 
@@ -316,6 +353,7 @@ def main():
     parser.add_argument('--file', '-f', help='File path')
     parser.add_argument('--task', '-t', help='Task description for prompt generation')
     parser.add_argument('--output', '-o', help='Output file for export')
+    parser.add_argument('--pretty', action='store_true', help='Indent exported JSON')
 
     args = parser.parse_args()
 
@@ -348,7 +386,7 @@ def main():
             if not args.project or not args.output:
                 print("Error: --project and --output required")
                 return 1
-            output = ctx.export_context_json(args.project, args.output)
+            output = ctx.export_context_json(args.project, args.output, pretty=args.pretty)
             print(f"Exported to {output}")
 
     return 0
@@ -10,10 +10,14 @@ This module sets up a unified logging system with:
 
 import logging
 import os
+import re
 import sys
 from pathlib import Path
 from typing import Optional
 
+# A %-style levelname field with its conversion spec, e.g. %(levelname)-8s
+_LEVELNAME_FIELD = re.compile(r'%\(levelname\)([#0+ -]*\d*(?:\.\d+)?[sr])')
+
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with color support for console output."""
@@ -32,12 +36,25 @@ class ColoredFormatter(logging.Formatter):
         super().__init__(fmt)
         self.use_color = use_color and sys.stdout.isatty()
 
-    def format(self, record: logging.LogRecord) -> str:
+        # One plain formatter per level name with the colored name baked into
+        # the format string, so format() does no per-record string building
+        self._level_formatters = {}
         if self.use_color:
-            levelname = record.levelname
-            if levelname in self.COLORS:
-                record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+            for levelname, color in self.COLORS.items():
+                if levelname == 'RESET':
+                    continue
+                colored = f"{color}{levelname}{self.COLORS['RESET']}"
+                level_fmt = _LEVELNAME_FIELD.sub(
+                    lambda m: (('%' + m.group(1)) % colored).replace('%', '%%'),
+                    self._fmt,
+                )
+                self._level_formatters[levelname] = logging.Formatter(level_fmt, self.datefmt)
+
+    def format(self, record: logging.LogRecord) -> str:
+        formatter = self._level_formatters.get(record.levelname)
+        if formatter is None:
+            return super().format(record)
+        return formatter.format(record)
 
 
 def setup_logging(
@@ -122,25 +139,29 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+# Logger behind the convenience functions, bound once instead of per call
+_templedb_logger = logging.getLogger('templedb')
+
+
 # Convenience functions for quick migration from print()
-def info(msg: str) -> None:
+def info(msg: str, *args) -> None:
     """Log info message (replaces print for informational output)."""
-    logging.getLogger('templedb').info(msg)
+    _templedb_logger.info(msg, *args)
 
 
-def debug(msg: str) -> None:
+def debug(msg: str, *args) -> None:
     """Log debug message (replaces print for detailed diagnostics)."""
-    logging.getLogger('templedb').debug(msg)
+    _templedb_logger.debug(msg, *args)
 
 
-def warning(msg: str) -> None:
+def warning(msg: str, *args) -> None:
     """Log warning message (replaces print for warnings)."""
-    logging.getLogger('templedb').warning(msg)
+    _templedb_logger.warning(msg, *args)
 
 
-def error(msg: str) -> None:
+def error(msg: str, *args) -> None:
     """Log error message (replaces print for errors)."""
-    logging.getLogger('templedb').error(msg)
+    _templedb_logger.error(msg, *args)
 
 
 # Example usage patterns for migration:
@@ -149,10 +170,12 @@ def error(msg: str) -> None:
 # NEW: logger.info("Processing project...")
 #
 # OLD: print(f"Debug: value={value}")
-# NEW: logger.debug(f"Debug: value={value}")
+# NEW: logger.debug("Debug: value=%s", value)
+#      (pass arguments instead of an f-string; they are only formatted
+#      when the level is enabled)
 #
 # OLD: print(f"⚠️  Warning: {issue}")
-# NEW: logger.warning(f"Warning: {issue}")
+# NEW: logger.warning("Warning: %s", issue)
 #
 # OLD: print(f"Error: {error}")
-# NEW: logger.error(f"Error: {error}")
+# NEW: logger.error("Error: %s", error)
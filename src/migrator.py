@@ -60,6 +60,10 @@ MIGRATION_SEQUENCE = [
     "file_versioning_schema.sql",
     "vcs_metadata_schema.sql",
     "views.sql",
+    "072_add_sql_analysis_cache.sql",
+    "073_add_file_stat_cache.sql",
+    "074_add_env_vars_environment_index.sql",
+    "075_version_sql_analysis_cache.sql",
 ]
 
 
@@ -31,11 +31,12 @@ class DeploymentPipelineService:
     """Orchestrates automated deployment pipelines."""
 
     def __init__(self):
-        from db_utils import get_connection, query_one, query_all, execute
+        from db_utils import get_connection, query_one, query_all, execute, executemany
         self.get_connection = get_connection
         self.query_one = query_one
         self.query_all = query_all
         self.execute = execute
+        self.executemany = executemany
 
     # ------------------------------------------------------------------
     # Trigger management
@@ -287,12 +288,11 @@ class DeploymentPipelineService:
                 env_vars = snapshot.get('environment_variables', {})
                 if env_vars:
                     logger.info(f"  Restoring {len(env_vars)} environment variables from snapshot")
-                    for key, value in env_vars.items():
-                        self.execute("""
-                            INSERT OR REPLACE INTO environment_variables
-                                (scope_type, scope_id, var_name, var_value, deployment_target)
-                            VALUES ('project', ?, ?, ?, ?)
-                        """, (project['id'], key, value, target))
+                    self.executemany("""
+                        INSERT OR REPLACE INTO environment_variables
+                            (scope_type, scope_id, var_name, var_value, deployment_target)
+                        VALUES ('project', ?, ?, ?, ?)
+                    """, [(project['id'], key, value, target) for key, value in env_vars.items()])
             except (json.JSONDecodeError, TypeError):
                 logger.warning("  Could not restore environment snapshot")
 
@@ -442,6 +442,115 @@ class TestDirenvGenerator:
         if (repo / ".git").exists():
             assert branch is not None
 
+    @staticmethod
+    def _fake_sops(tmp_path, monkeypatch):
+        """Put a sops on PATH that echoes its input, logging each call to tmp_path/calls"""
+        bindir = tmp_path / "bin"
+        bindir.mkdir()
+        sops = bindir / "sops"
+        sops.write_text(f'#!/bin/sh\necho call >> "{tmp_path}/calls"\ncat\n')
+        sops.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+
+    def test_secret_cache_skips_repeat_sops(self, tmp_path, monkeypatch):
+        from direnv_generator import sops_decrypt_yaml_cached
+        self._fake_sops(tmp_path, monkeypatch)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+        monkeypatch.delenv("TEMPLEDB_SECRET_CACHE", raising=False)
+        assert sops_decrypt_yaml_cached(b"env: {A: 1}\n") == b"env: {A: 1}\n"
+        assert not (tmp_path / "templedb-secrets").exists()
+
+        monkeypatch.setenv("TEMPLEDB_SECRET_CACHE", "1")
+        for _ in range(3):
+            assert sops_decrypt_yaml_cached(b"env: {A: 1}\n") == b"env: {A: 1}\n"
+        assert (tmp_path / "calls").read_text().count("call") == 2
+        cached = list((tmp_path / "templedb-secrets").iterdir())
+        assert len(cached) == 1
+        assert cached[0].stat().st_mode & 0o777 == 0o600
+
+    def test_resolve_template_deep_and_cyclic_compounds(self):
+        from direnv_generator import TempledbError, resolve_template
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE projects (id INTEGER PRIMARY KEY, slug TEXT);
+            INSERT INTO projects VALUES (1, 'p');
+            CREATE TABLE env_vars (key TEXT, value TEXT, environment TEXT);
+            INSERT INTO env_vars VALUES ('HOST', 'db', 'default');
+            CREATE TABLE compound_values (project_id INT, profile TEXT, key TEXT, value_template TEXT);
+        """)
+        depth = 3000  # well past the default recursion limit
+        conn.executemany(
+            "INSERT INTO compound_values VALUES (1, 'default', ?, ?)",
+            [(f"C{i}", f"${{compound:C{i + 1}}}") for i in range(depth)]
+            + [(f"C{depth}", "${env:HOST}"), ("LOOP", "x${compound:LOOP}")],
+        )
+        assert resolve_template(conn, "p", "default", "${compound:C0}:5432") == "db:5432"
+        with pytest.raises(TempledbError, match="circular dependency.*LOOP"):
+            resolve_template(conn, "p", "default", "${compound:LOOP}")
+
+    def test_resolve_template_secret_reference(self, tmp_path, monkeypatch):
+        from direnv_generator import resolve_template
+        self._fake_sops(tmp_path, monkeypatch)
+        monkeypatch.delenv("TEMPLEDB_SECRET_CACHE", raising=False)
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE projects (id INTEGER PRIMARY KEY, slug TEXT);
+            INSERT INTO projects VALUES (1, 'p');
+            CREATE TABLE secret_blobs (id INTEGER PRIMARY KEY, profile TEXT, secret_blob BLOB);
+            CREATE TABLE project_secret_blobs (project_id INT, secret_blob_id INT, profile TEXT);
+            INSERT INTO project_secret_blobs VALUES (1, 1, 'default');
+            CREATE TABLE compound_values (project_id INT, profile TEXT, key TEXT, value_template TEXT);
+            INSERT INTO compound_values VALUES (1, 'default', 'DSN', '${secret:DB_USER}@db');
+        """)
+        conn.execute("INSERT INTO secret_blobs VALUES (1, 'default', ?)",
+                     (b"env: {DB_USER: app, DB_PASS: pw}\n",))
+        assert resolve_template(conn, "p", "default", "${compound:DSN}") == "app@db"
+
+        # Every secret reference in one resolve shares a single decryption
+        (tmp_path / "calls").unlink()
+        template = "${secret:DB_USER}:${secret:DB_PASS}/${compound:DSN}/${secret:DB_PASS}"
+        assert resolve_template(conn, "p", "default", template) == "app:pw/app@db/pw"
+        assert (tmp_path / "calls").read_text().count("call") == 1
+
+    def test_direnv_decrypts_secret_blob_once(self, tmp_path, monkeypatch, capsys):
+        from direnv_generator import cmd_direnv
+        self._fake_sops(tmp_path, monkeypatch)
+        monkeypatch.delenv("TEMPLEDB_SECRET_CACHE", raising=False)
+        monkeypatch.chdir(tmp_path)
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE projects (id INTEGER PRIMARY KEY, slug TEXT);
+            INSERT INTO projects VALUES (1, 'p');
+            CREATE TABLE nix_configs (id INTEGER PRIMARY KEY, project_id INT, profile TEXT,
+                                      nix_text TEXT, flake_text TEXT, flake_lock TEXT);
+            CREATE TABLE secret_blobs (id INTEGER PRIMARY KEY, profile TEXT, secret_blob BLOB);
+            CREATE TABLE project_secret_blobs (project_id INT, secret_blob_id INT, profile TEXT);
+            INSERT INTO project_secret_blobs VALUES (1, 1, 'default');
+            CREATE TABLE env_vars (key TEXT, value TEXT, environment TEXT);
+            CREATE TABLE compound_values (project_id INT, profile TEXT, key TEXT, value_template TEXT);
+            INSERT INTO compound_values VALUES (1, 'default', 'DSN', '${secret:DB_USER}@db');
+        """)
+        conn.execute("INSERT INTO secret_blobs VALUES (1, 'default', ?)",
+                     (b"env: {DB_USER: app}\n",))
+        cmd_direnv(conn, "p", "default", load_nix=False, branch_override="feature")
+        assert "export DSN='app@db'" in capsys.readouterr().out
+        assert (tmp_path / "calls").read_text().count("call") == 1
+
+    def test_write_if_changed_keeps_mtime(self, tmp_path):
+        from direnv_generator import _write_if_changed
+        flake = tmp_path / "flake.nix"
+        _write_if_changed(flake, "{ }\n")
+        os.utime(flake, ns=(1_000_000_000, 1_000_000_000))
+        _write_if_changed(flake, "{ }\n")
+        assert flake.stat().st_mtime_ns == 1_000_000_000
+        _write_if_changed(flake, "{ outputs = _: { }; }\n")
+        assert flake.read_text() == "{ outputs = _: { }; }\n"
+        assert flake.stat().st_mtime_ns != 1_000_000_000
+
 
 # ── Sync Engine Tests ─────────────────────────────────────────────────────────
 
@@ -406,6 +406,42 @@ class TestBackwardsCompatibility(unittest.TestCase):
         file_content = ContentStore.read_file_content(test_file)
         self.assertIsNone(file_content)
 
+    def test_read_many_matches_single_reads(self):
+        """read_many() should yield the same results as read_file_content(), in order"""
+        paths = []
+        for i in range(5):
+            test_file = Path(self.test_dir) / f"file{i}.txt"
+            test_file.write_text(f"content {i}\n")
+            paths.append(test_file)
+        paths.append(Path(self.test_dir) / "missing.txt")
+
+        results = list(ContentStore.read_many(paths, max_workers=2))
+
+        self.assertEqual([p for p, _ in results], paths)
+        for path, file_content in results[:-1]:
+            self.assertEqual(file_content, ContentStore.read_file_content(path))
+        self.assertIsNone(results[-1][1])
+
+    def test_mapped_read_matches_plain_read(self):
+        """Files above MMAP_THRESHOLD should hash and decode like small files"""
+        from importer import content
+
+        text_file = Path(self.test_dir) / "big.txt"
+        text_file.write_bytes(b"line\r\n" * (content.MMAP_THRESHOLD // 4))
+        binary_file = Path(self.test_dir) / "big.bin"
+        binary_file.write_bytes(os.urandom(content.MMAP_THRESHOLD + 1))
+
+        mapped = [ContentStore.read_file_content(p) for p in (text_file, binary_file)]
+        original = content.MMAP_THRESHOLD
+        content.MMAP_THRESHOLD = config.BLOB_INLINE_THRESHOLD + 1
+        try:
+            plain = [ContentStore.read_file_content(p) for p in (text_file, binary_file)]
+        finally:
+            content.MMAP_THRESHOLD = original
+
+        self.assertEqual(mapped, plain)
+        self.assertEqual(mapped[1].hash_sha256, ContentStore.calculate_hash_streaming(binary_file))
+
 
 class TestContentDeduplication(unittest.TestCase):
     """Test that content deduplication still works with external storage"""
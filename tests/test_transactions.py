@@ -10,14 +10,18 @@ Moved from root test_transactions.py and updated to use common fixtures.
 """
 
 import pytest
+import sqlite3
+import subprocess
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from db_utils import query_one, execute
+from db_utils import query_one, query_all, execute, get_connection
 from importer import ProjectImporter
+from importer.sql_analyzer import SqlAnalyzer
 from conftest import temp_project_dir, clean_db_session
 
 
@@ -160,3 +164,187 @@ def test_import_empty_directory(clean_db_session):
         if project:
             execute("DELETE FROM projects WHERE id = ?", (project['id'],))
         shutil.rmtree(empty_dir, ignore_errors=True)
+
+
+@pytest.mark.integration
+def test_fast_import_restores_durability_pragmas(temp_project_dir: Path, clean_db_session):
+    """Test that --fast import works alongside other connections and restores durability pragmas"""
+
+    project_slug = f"test_fast_{id(temp_project_dir)}"
+
+    try:
+        before_sync = query_one("PRAGMA synchronous")['synchronous']
+        before_journal = query_one("PRAGMA journal_mode")['journal_mode']
+
+        execute("""
+            INSERT INTO projects (slug, name, repo_url, git_branch)
+            VALUES (?, ?, ?, 'main')
+        """, (project_slug, project_slug, str(temp_project_dir)))
+
+        # Another open connection (TUI, MCP server) must not block --fast
+        other = sqlite3.connect(get_connection().execute("PRAGMA database_list").fetchone()[2])
+        other.execute("SELECT COUNT(*) FROM projects").fetchone()
+        try:
+            importer = ProjectImporter(project_slug, str(temp_project_dir), fast=True)
+            stats = importer.import_files()
+        finally:
+            other.close()
+
+        assert stats.files_imported > 0, "Should have imported files"
+        assert query_one("PRAGMA synchronous")['synchronous'] == before_sync
+        assert query_one("PRAGMA journal_mode")['journal_mode'] == before_journal
+
+    finally:
+        # Cleanup
+        project = query_one("SELECT id FROM projects WHERE slug = ?", (project_slug,))
+        if project:
+            execute("DELETE FROM file_contents WHERE file_id IN (SELECT id FROM project_files WHERE project_id = ?)", (project['id'],))
+            execute("DELETE FROM project_files WHERE project_id = ?", (project['id'],))
+            execute("DELETE FROM projects WHERE id = ?", (project['id'],))
+
+
+@pytest.mark.integration
+def test_reimport_reuses_sql_analysis_cache(temp_project_dir: Path, clean_db_session):
+    """Test that re-importing unchanged SQL reuses cached analysis"""
+
+    project_slug = f"test_sqlcache_{id(temp_project_dir)}"
+    (temp_project_dir / 'tables.sql').write_text(
+        'CREATE TABLE users (id int);\nCREATE VIEW active_users AS SELECT * FROM users;\n'
+    )
+
+    try:
+        execute("""
+            INSERT INTO projects (slug, name, repo_url, git_branch)
+            VALUES (?, ?, ?, 'main')
+        """, (project_slug, project_slug, str(temp_project_dir)))
+
+        first = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        assert first.sql_objects_found == 2
+
+        content_hash = query_one("""
+            SELECT fc.content_hash FROM file_contents fc
+            JOIN project_files pf ON pf.id = fc.file_id
+            WHERE pf.file_path = 'tables.sql'
+        """)['content_hash']
+        assert query_one(
+            "SELECT 1 AS hit FROM sql_analysis_cache WHERE content_hash = ?", (content_hash,)
+        ), "Analysis should be cached by content hash"
+
+        # Change the file, then restore it: the restored content is a cache hit
+        original = (temp_project_dir / 'tables.sql').read_text()
+        (temp_project_dir / 'tables.sql').write_text('CREATE TABLE other (id int);\n')
+        ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        (temp_project_dir / 'tables.sql').write_text(original)
+
+        with patch.object(SqlAnalyzer, 'analyze_sql_file',
+                          wraps=SqlAnalyzer.analyze_sql_file) as analyze:
+            restored = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        analyzed = [Path(call.args[0]).name for call in analyze.call_args_list]
+        assert 'tables.sql' not in analyzed, "Cache hit should skip analysis"
+        assert restored.sql_objects_found == first.sql_objects_found
+
+        # A new analyzer version ignores, then drops, analyses cached by the old one
+        (temp_project_dir / 'tables.sql').write_text('CREATE TABLE other (id int);\n')
+        ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        (temp_project_dir / 'tables.sql').write_text(original)
+        new_version = SqlAnalyzer.CACHE_VERSION + 1
+        with patch.object(SqlAnalyzer, 'CACHE_VERSION', new_version), \
+                patch.object(SqlAnalyzer, 'analyze_sql_file',
+                             wraps=SqlAnalyzer.analyze_sql_file) as analyze:
+            ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        analyzed = [Path(call.args[0]).name for call in analyze.call_args_list]
+        assert 'tables.sql' in analyzed, "Old-version analysis should not be reused"
+        assert not query_one(
+            "SELECT 1 AS stale FROM sql_analysis_cache WHERE analyzer_version != ?", (new_version,)
+        ), "Old-version analyses should be dropped"
+
+    finally:
+        # Cleanup
+        project = query_one("SELECT id FROM projects WHERE slug = ?", (project_slug,))
+        if project:
+            execute("DELETE FROM file_contents WHERE file_id IN (SELECT id FROM project_files WHERE project_id = ?)", (project['id'],))
+            execute("DELETE FROM project_files WHERE project_id = ?", (project['id'],))
+            execute("DELETE FROM projects WHERE id = ?", (project['id'],))
+
+
+@pytest.mark.integration
+def test_unchanged_reimport_refreshes_commit_hashes(temp_project_dir: Path, clean_db_session):
+    """Test that re-importing after a git commit records the new last_commit_hash"""
+
+    project_slug = f"test_commits_{id(temp_project_dir)}"
+
+    def git(*args):
+        return subprocess.run(
+            ['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+            cwd=temp_project_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        execute("""
+            INSERT INTO projects (slug, name, repo_url, git_branch)
+            VALUES (?, ?, ?, 'main')
+        """, (project_slug, project_slug, str(temp_project_dir)))
+
+        git('init', '-q')
+        ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        git('add', '-A')
+        git('commit', '-q', '-m', 'initial')
+
+        stats = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        assert stats.files_imported == 0, "Unchanged files should not be re-imported"
+        row = query_one("""
+            SELECT pf.last_commit_hash FROM project_files pf
+            JOIN projects p ON p.id = pf.project_id
+            WHERE p.slug = ? AND pf.file_path = 'test.py'
+        """, (project_slug,))
+        assert row['last_commit_hash'] == git('rev-parse', 'HEAD')
+
+    finally:
+        # Cleanup
+        project = query_one("SELECT id FROM projects WHERE slug = ?", (project_slug,))
+        if project:
+            execute("DELETE FROM file_contents WHERE file_id IN (SELECT id FROM project_files WHERE project_id = ?)", (project['id'],))
+            execute("DELETE FROM project_files WHERE project_id = ?", (project['id'],))
+            execute("DELETE FROM projects WHERE id = ?", (project['id'],))
+
+
+@pytest.mark.integration
+def test_unchanged_reimport_exits_early(temp_project_dir: Path, clean_db_session):
+    """Test that re-importing unchanged files skips all work and keeps file ids"""
+
+    project_slug = f"test_unchanged_{id(temp_project_dir)}"
+
+    try:
+        execute("""
+            INSERT INTO projects (slug, name, repo_url, git_branch)
+            VALUES (?, ?, ?, 'main')
+        """, (project_slug, project_slug, str(temp_project_dir)))
+        project_id = query_one("SELECT id FROM projects WHERE slug = ?", (project_slug,))['id']
+
+        def file_ids():
+            rows = query_all(
+                "SELECT id, file_path FROM project_files WHERE project_id = ?", (project_id,)
+            )
+            return {row['file_path']: row['id'] for row in rows}
+
+        first = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        assert first.files_imported > 0
+        ids_before = file_ids()
+
+        second = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        assert second.files_imported == 0, "Unchanged files should not be re-imported"
+        assert second.content_stored == 0
+
+        (temp_project_dir / 'test.py').write_text('print("changed")\n')
+        third = ProjectImporter(project_slug, str(temp_project_dir)).import_files()
+        assert third.files_imported == 1, "Only the modified file should be re-imported"
+        assert third.content_stored == 1
+        assert file_ids() == ids_before, "Re-import should keep file ids stable"
+
+    finally:
+        # Cleanup
+        project = query_one("SELECT id FROM projects WHERE slug = ?", (project_slug,))
+        if project:
+            execute("DELETE FROM file_contents WHERE file_id IN (SELECT id FROM project_files WHERE project_id = ?)", (project['id'],))
+            execute("DELETE FROM project_files WHERE project_id = ?", (project['id'],))
+            execute("DELETE FROM projects WHERE id = ?", (project['id'],))